@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Boolean, Date, ForeignKey
+from sqlalchemy import BigInteger, Column, DDL, Integer, String, Numeric, Boolean, Date, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 
 from .connection import Base
@@ -36,6 +36,19 @@ class Expense(Base):
     """
 
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Keyset pagination walks (expense_date, id) in order
+        Index("ix_expenses_expense_date_id", "expense_date", "id"),
+        # Category filters restricted to a date range
+        Index("ix_expenses_category_id_expense_date", "category_id", "expense_date"),
+        # Substring search on descriptions (PostgreSQL pg_trgm only)
+        Index(
+            "ix_expenses_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True)
     amount = Column(Numeric(10, 2), nullable=False)
@@ -43,3 +56,78 @@ class Expense(Base):
     expense_date = Column(Date, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"))
     category = relationship("Category", back_populates="expenses")
+
+
+# The trigram operator class must exist before the expenses indexes are created
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+
+class ExpenseRollup(Base):
+    """
+    Pre-aggregated expenses for one (month, category) pair.
+
+    Maintained in the same transaction as every expense write (see
+    app/services/rollups.py) so reports never have to scan the expenses table.
+
+    Attributes:
+        month (date): First day of the month.
+        category_id (int): Category of the aggregated expenses (0 for uncategorized).
+        total (Decimal): Sum of the expense amounts.
+        count (int): Number of expenses.
+        min_amount (Decimal): Smallest expense amount.
+        max_amount (Decimal): Largest expense amount.
+    """
+
+    __tablename__ = "expense_rollups"
+
+    month = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    total = Column(Numeric(14, 2), nullable=False)
+    count = Column(Integer, nullable=False)
+    min_amount = Column(Numeric(10, 2), nullable=False)
+    max_amount = Column(Numeric(10, 2), nullable=False)
+
+
+class ExpenseAmountBucket(Base):
+    """
+    Count of expenses of one (month, category) pair falling in one amount bucket.
+
+    The buckets of a (month, category) pair form a mergeable quantile
+    sketch (see app/services/distributions.py), maintained alongside the
+    rollups so percentiles never need a scan of the expenses table.
+
+    Attributes:
+        month (date): First day of the month.
+        category_id (int): Category of the counted expenses (0 for uncategorized).
+        bucket (int): Logarithmic amount bucket index.
+        count (int): Number of expenses in the bucket.
+    """
+
+    __tablename__ = "expense_amount_buckets"
+
+    month = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+
+class DataVersion(Base):
+    """
+    Monotonic counter bumped by every transaction that changes expense data.
+
+    Caches use it as a stamp: a cached result is valid as long as the
+    version it was computed at is still the current one.
+
+    Attributes:
+        name (str): Name of the counter (e.g. "data").
+        version (int): Current value of the counter.
+    """
+
+    __tablename__ = "data_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
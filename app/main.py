@@ -1,13 +1,46 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.database.connection import engine
-from app.database.models import Base
+from app.config import settings
 from app.services import insights_service
+from app.services import rollups  # Registers the hooks that keep expense rollups up to date
+from app.services import data_version  # Registers the hooks that bump the data version
+from app.services import analytics_engine  # Registers the hooks that append to the analytics snapshot
+from app.services.metrics import MetricsMiddleware
+from app.services.read_routing import ReadYourWritesMiddleware
+from app.services.partitions import maintain_partitions
+from app.services import report_jobs
+from app.database.connection import SessionLocal
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts background maintenance tasks and stops them on shutdown.
+
+    With EXPENSE_PARTITIONING, upcoming monthly expense partitions are
+    created in the background; startup does not wait for it. The report
+    job process pool (started on the first job) is stopped on shutdown.
+    """
+    tasks = []
+    if settings.expense_partitioning:
+        tasks.append(asyncio.create_task(maintain_partitions(SessionLocal, settings.partition_months_ahead)))
+    yield
+    for task in tasks:
+        task.cancel()
+    report_jobs.shutdown()
+
 
 # Initialize FastAPI app
-app = FastAPI(title="SpendMind")
+app = FastAPI(title="SpendMind", lifespan=lifespan)
+
+# Per-route latency, SQL and response size metrics (served at /metrics)
+app.add_middleware(MetricsMiddleware, server_timing=settings.server_timing)
 
-# Create all database tables
-Base.metadata.create_all(bind=engine)
+# Clients that just wrote read from the primary instead of a lagging replica
+if settings.read_database_url and settings.read_your_writes_seconds > 0:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.read_your_writes_seconds)
 
 
 @app.get("/")
@@ -37,3 +70,9 @@ app.include_router(insights.router)
 
 from app.routers import charts
 app.include_router(charts.router)
+
+from app.routers import admin
+app.include_router(admin.router)
+
+from app.routers import metrics
+app.include_router(metrics.router)
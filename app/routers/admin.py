@@ -0,0 +1,119 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config import settings
+from app.database import connection
+from app.database.pool import pool_status
+from app.services import category_cache, chart_renderer, result_cache, slow_queries
+
+
+
+def require_admin(authorization: str | None = Header(None)):
+    """
+    Only lets requests carrying `Authorization: Bearer <ADMIN_TOKEN>` through.
+
+    The endpoints expose SQL statements and parameters of other users'
+    requests, so they are disabled (404) unless ADMIN_TOKEN is set.
+
+    Args:
+        authorization (str | None): Value of the Authorization header.
+
+    Raises:
+        HTTPException: 404 if ADMIN_TOKEN is not set, 401 if the token is missing or wrong.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.admin_token.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+# Create a router for operational endpoints
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/pool")
+def get_pool_stats():
+    """
+    Reports connection pool usage for the async (API), read replica and sync (scripts) engines.
+
+    Use it to size DB_POOL_SIZE / DB_MAX_OVERFLOW against the number of
+    workers: a growing wait time or timeouts mean requests queue for connections.
+
+    Returns:
+        dict: Pool configuration and, per engine, checked-out, idle and
+        overflow connections with cumulative checkout wait time. The
+        read engine is reported only when READ_DATABASE_URL is set.
+    """
+    stats = {
+        "config": {
+            "pool_size": settings.pool_size,
+            "max_overflow": settings.max_overflow,
+            "pool_timeout": settings.pool_timeout,
+            "pool_pre_ping": settings.pool_pre_ping,
+            "pool_recycle": settings.pool_recycle,
+            "statement_timeout_ms": settings.statement_timeout_ms,
+        },
+        "async_engine": pool_status(connection.async_engine.sync_engine.pool),
+        "sync_engine": pool_status(connection.engine.pool),
+    }
+    if connection.read_async_engine is not connection.async_engine:
+        stats["read_async_engine"] = pool_status(connection.read_async_engine.sync_engine.pool)
+    return stats
+
+
+@router.get("/cache")
+def get_cache_stats():
+    """
+    Reports hit/miss/eviction counters of the result and chart caches,
+    and the state of the category cache.
+
+    Counters are per worker process; the SQLite result backend shares
+    its entries (not its counters) between workers.
+
+    Returns:
+        dict: Statistics of the report/insight result cache, the chart image cache and the category cache.
+    """
+    return {
+        "results": result_cache.describe(),
+        "charts": chart_renderer.cache.stats(),
+        "categories": category_cache.stats(),
+    }
+
+
+@router.get("/slow-queries")
+def get_slow_queries():
+    """
+    Lists the most recent statements slower than SLOW_QUERY_MS, newest first.
+
+    Each entry has the statement, its bound parameters, the route that
+    issued it and, for SELECTs on PostgreSQL, the EXPLAIN (ANALYZE, BUFFERS)
+    plan (filled in shortly after the statement is recorded). Look for
+    "Seq Scan on expenses" to spot missing indexes.
+
+    Returns:
+        dict: Threshold, buffer size and recorded statements (per worker process).
+    """
+    return {
+        "threshold_ms": slow_queries.log.threshold_ms,
+        "capacity": slow_queries.log.size,
+        "entries": slow_queries.log.entries(),
+    }
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    """
+    Empties the slow-query buffer of this worker process.
+
+    Returns:
+        dict: Confirmation message.
+    """
+    slow_queries.log.clear()
+    return {"detail": "Slow-query log cleared"}
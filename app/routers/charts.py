@@ -1,60 +1,437 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+import calendar
+from datetime import date
+from typing import Literal, NamedTuple
 
-import matplotlib.pyplot as plt
-import io
+import numpy as np
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.connection import get_db
-from app.database.models import Expense
+from app.database.connection import get_read_db
+from app.services import aggregation, category_cache
+from app.services.chart_renderer import DEFAULT_SIZE, MEDIA_TYPES, render_chart
+from app.services.data_version import current_version
+from app.services.downsampling import lttb_indices
 
 # Create a router for chart-related endpoints
 router = APIRouter(prefix="/charts", tags=["Charts"])
 
+# Bounds of the requested image size, in pixels
+MIN_WIDTH, MAX_WIDTH = 200, 3000
+MIN_HEIGHT, MAX_HEIGHT = 150, 2000
+
+
+class ChartOptions(NamedTuple):
+    """
+    Output options shared by every chart.
+
+    Attributes:
+        fmt (str): "png" or "svg".
+        width (int): Image width in pixels, also the most points a line is drawn with.
+        height (int): Image height in pixels.
+    """
+    fmt: str
+    width: int
+    height: int
+
+
+def chart_options(
+    format: Literal["png", "svg"] = "png",
+    width: int = Query(DEFAULT_SIZE[0], ge=MIN_WIDTH, le=MAX_WIDTH),
+    height: int = Query(DEFAULT_SIZE[1], ge=MIN_HEIGHT, le=MAX_HEIGHT)
+) -> ChartOptions:
+    """
+    Reads the format, width and height query parameters.
+    """
+    return ChartOptions(format, width, height)
+
+
+async def chart_response(db: AsyncSession, key: tuple, load_and_draw, options: ChartOptions) -> Response:
+    """
+    Renders a chart (or takes it from the cache) and wraps it in a response.
+
+    Rendered images are cached per data version, parameters, format and
+    size, so repeated requests are served from memory until expenses change.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        key (tuple): Chart name and parameters.
+        load_and_draw (Callable): Async function loading the data and returning a `draw(figure)` callable.
+        options (ChartOptions): Output format and size.
+
+    Returns:
+        Response: Encoded image.
+    """
+    version = await db.run_sync(current_version)
+    image = await render_chart(
+        (*key, version), load_and_draw, fmt=options.fmt, size=(options.width, options.height)
+    )
+    return Response(content=image, media_type=MEDIA_TYPES[options.fmt])
+
+
+def daily_range(rows: list, first_day: date, last_day: date) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Spreads sparse per-day aggregation rows over every day of a range.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Days (datetime64) and totals (0 for days without expenses).
+    """
+    days = np.arange(np.datetime64(first_day, "D"), np.datetime64(last_day, "D") + 1)
+    totals = np.zeros(len(days))
+    for row in rows:
+        totals[(row.period - first_day).days] = float(row.total)
+    return days, totals
+
+
+async def get_monthly_chart_data(db: AsyncSession):
+    """
+    Returns the labels and totals plotted by the monthly expenses chart.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+
+    Returns:
+        tuple[list[str], list]: Month labels ("M/YYYY") and total spent per month.
+    """
+
+    # Monthly totals, served from the rollup table
+    results = await aggregation.aggregate(db, granularity="month")
+
+    # Prepare labels and totals for plotting
+    labels = [f"{r.period.month}/{r.period.year}" for r in results]
+    totals = [float(r.total) for r in results]
+
+    return labels, totals
+
+
+def draw_monthly_expenses(figure, labels: list[str], totals: list[float]):
+    """
+    Draws the monthly expenses line chart on a matplotlib Figure.
+
+    Args:
+        figure (Figure): Figure to draw on.
+        labels (list[str]): Month labels for the x axis.
+        totals (list[float]): Total spent per month.
+    """
+    ax = figure.add_subplot()
+    ax.plot(labels, totals, marker="o")
+    ax.set_title("Monthly Expenses")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Total Spent")
+    ax.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+
 
 @router.get("/monthly-expenses")
-def monthly_expenses_chart(db: Session = Depends(get_db)):
+async def monthly_expenses_chart(
+    options: ChartOptions = Depends(chart_options),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Generates a line chart of monthly expenses.
 
     Args:
-        db (Session): SQLAlchemy database session (injected by Depends).
+        options (ChartOptions): format ("png" or "svg"), width and height in pixels.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Returns:
-        StreamingResponse: PNG image of the monthly expenses chart.
+        Response: Image of the monthly expenses chart.
     """
 
-    # Query to calculate total expenses grouped by year and month
-    results = (
-        db.query(
-            extract("year", Expense.expense_date).label("year"),
-            extract("month", Expense.expense_date).label("month"),
-            func.sum(Expense.amount).label("total")
-        )
-        .group_by("year", "month")
-        .order_by("year", "month")
-        .all()
+    # Only runs when the chart is not cached yet
+    async def load_and_draw():
+        labels, totals = await get_monthly_chart_data(db)
+        return lambda figure: draw_monthly_expenses(figure, labels, totals)
+
+    return await chart_response(db, ("monthly-expenses",), load_and_draw, options)
+
+
+async def get_daily_chart_data(
+    db: AsyncSession,
+    start_date: date | None,
+    end_date: date | None,
+    max_points: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the days and totals plotted by the daily spend chart.
+
+    The series covers every day of the range and is downsampled with LTTB
+    to at most `max_points` points, so the render cost depends on the image
+    width rather than on the length of the history.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        start_date (date | None): First day (defaults to the first expense).
+        end_date (date | None): Last day (defaults to the last expense).
+        max_points (int): Most points to plot.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Days (datetime64) and total spent per day.
+    """
+    rows = await aggregation.aggregate(db, granularity="day", start_date=start_date, end_date=end_date)
+    if not rows:
+        return np.array([], dtype="datetime64[D]"), np.array([])
+
+    days, totals = daily_range(rows, start_date or rows[0].period, end_date or rows[-1].period)
+    kept = lttb_indices(days.astype(np.int64), totals, max_points)
+    return days[kept], totals[kept]
+
+
+def draw_daily_spend(figure, days: np.ndarray, totals: np.ndarray):
+    """
+    Draws the daily spend line chart on a matplotlib Figure.
+    """
+    ax = figure.add_subplot()
+    ax.plot(days, totals, linewidth=0.8)
+    if len(days) > 1:
+        # No padding: matplotlib dates stop at year 9999
+        ax.set_xlim(days[0], days[-1])
+    ax.set_title("Daily Spend")
+    ax.set_xlabel("Day")
+    ax.set_ylabel("Total Spent")
+    figure.autofmt_xdate()
+    figure.tight_layout()
+
+
+@router.get("/daily-spend")
+async def daily_spend_chart(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    options: ChartOptions = Depends(chart_options),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Generates a line chart of the spend of every day.
+
+    Long histories are downsampled server-side (LTTB) to one point per
+    pixel of width, keeping peaks while bounding the render time.
+
+    Args:
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        options (ChartOptions): format ("png" or "svg"), width and height in pixels.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Returns:
+        Response: Image of the daily spend chart.
+    """
+
+    async def load_and_draw():
+        days, totals = await get_daily_chart_data(db, start_date, end_date, options.width)
+        return lambda figure: draw_daily_spend(figure, days, totals)
+
+    return await chart_response(db, ("daily-spend", start_date, end_date), load_and_draw, options)
+
+
+async def get_category_chart_data(
+    db: AsyncSession,
+    start_date: date | None,
+    end_date: date | None
+) -> tuple[list[str], list[float]]:
+    """
+    Returns the category names and totals plotted by the category breakdown chart.
+
+    Returns:
+        tuple[list[str], list[float]]: Names and totals, largest first.
+    """
+    rows = await aggregation.aggregate(db, dimension="category", start_date=start_date, end_date=end_date)
+    names = await category_cache.get_names(db)
+
+    rows = sorted(rows, key=lambda row: row.total, reverse=True)
+    labels = [names.get(row.key, "Uncategorized") for row in rows]
+    totals = [float(row.total) for row in rows]
+    return labels, totals
+
+
+def draw_category_breakdown(figure, labels: list[str], totals: list[float]):
+    """
+    Draws the category breakdown bar chart on a matplotlib Figure.
+    """
+    ax = figure.add_subplot()
+    # Reversed so the largest category is at the top
+    ax.barh(labels[::-1], totals[::-1])
+    ax.set_title("Expenses by Category")
+    ax.set_xlabel("Total Spent")
+    figure.tight_layout()
+
+
+@router.get("/category-breakdown")
+async def category_breakdown_chart(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    options: ChartOptions = Depends(chart_options),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Generates a horizontal bar chart of the total spent per category.
+
+    Args:
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        options (ChartOptions): format ("png" or "svg"), width and height in pixels.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Returns:
+        Response: Image of the category breakdown chart.
+    """
+
+    async def load_and_draw():
+        labels, totals = await get_category_chart_data(db, start_date, end_date)
+        return lambda figure: draw_category_breakdown(figure, labels, totals)
+
+    return await chart_response(db, ("category-breakdown", start_date, end_date), load_and_draw, options)
+
+
+async def get_essential_chart_data(
+    db: AsyncSession,
+    granularity: str,
+    start_date: date | None,
+    end_date: date | None,
+    max_points: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the periods and the essential / non-essential totals of the stacked area chart.
+
+    Uncategorized expenses count as non-essential. Daily series cover every
+    day of the range and are downsampled with LTTB on the combined total,
+    keeping the same days in both layers so the stack stays consistent.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        granularity (str): "day", "week" or "month".
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        max_points (int): Most points to plot.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Period starts (datetime64),
+        essential totals and non-essential totals.
+    """
+    rows = await aggregation.aggregate(
+        db, granularity=granularity, dimension="essential", start_date=start_date, end_date=end_date
     )
+    if not rows:
+        return np.array([], dtype="datetime64[D]"), np.array([]), np.array([])
 
-    # Prepare labels and totals for plotting
-    labels = [f"{int(r.month)}/{int(r.year)}" for r in results]
-    totals = [r.total for r in results]
-
-    # Create the plot
-    plt.figure()
-    plt.plot(labels, totals, marker="o")
-    plt.title("Monthly Expenses")
-    plt.xlabel("Month")
-    plt.ylabel("Total Spent")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-
-    # Save the plot to a BytesIO buffer
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-
-    # Return the image as a streaming response
-    return StreamingResponse(buf, media_type="image/png")
+    first_day, last_day = rows[0].period, max(row.period for row in rows)
+    if granularity == "day":
+        periods = np.arange(np.datetime64(first_day, "D"), np.datetime64(last_day, "D") + 1)
+    else:
+        periods = np.unique(np.array([row.period for row in rows], dtype="datetime64[D]"))
+
+    essential = np.zeros(len(periods))
+    other = np.zeros(len(periods))
+    positions = np.searchsorted(periods, np.array([row.period for row in rows], dtype="datetime64[D]"))
+    for position, row in zip(positions, rows):
+        (essential if row.key else other)[position] += float(row.total)
+
+    kept = lttb_indices(periods.astype(np.int64), essential + other, max_points)
+    return periods[kept], essential[kept], other[kept]
+
+
+def draw_essential_stacked(figure, periods: np.ndarray, essential: np.ndarray, other: np.ndarray):
+    """
+    Draws the essential vs. non-essential stacked area chart on a matplotlib Figure.
+    """
+    ax = figure.add_subplot()
+    ax.stackplot(periods, essential, other, labels=["Essential", "Non-essential"])
+    ax.set_title("Essential vs. Non-essential Spend")
+    ax.set_ylabel("Total Spent")
+    ax.legend(loc="upper left")
+    figure.autofmt_xdate()
+    figure.tight_layout()
+
+
+@router.get("/essential-stacked")
+async def essential_stacked_chart(
+    granularity: Literal["day", "week", "month"] = "month",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    options: ChartOptions = Depends(chart_options),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Generates a stacked area chart of essential and non-essential spend over time.
+
+    Daily series are downsampled server-side (LTTB) to the image width.
+
+    Args:
+        granularity (str): "day", "week" or "month".
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        options (ChartOptions): format ("png" or "svg"), width and height in pixels.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Returns:
+        Response: Image of the stacked area chart.
+    """
+
+    async def load_and_draw():
+        periods, essential, other = await get_essential_chart_data(
+            db, granularity, start_date, end_date, options.width
+        )
+        return lambda figure: draw_essential_stacked(figure, periods, essential, other)
+
+    key = ("essential-stacked", granularity, start_date, end_date)
+    return await chart_response(db, key, load_and_draw, options)
+
+
+async def get_heatmap_data(db: AsyncSession, year: int) -> np.ndarray:
+    """
+    Returns the daily spend of a year as a weekday x week grid.
+
+    Returns:
+        np.ndarray: 7 x 54 array (Monday first); days outside the year are NaN.
+    """
+    first_day, last_day = date(year, 1, 1), date(year, 12, 31)
+    rows = await aggregation.aggregate(db, granularity="day", start_date=first_day, end_date=last_day)
+    _, totals = daily_range(rows, first_day, last_day)
+
+    # Column of each day: weeks start on Monday, the first one holding January 1st
+    offsets = np.arange(len(totals)) + first_day.weekday()
+    grid = np.full((7, 54), np.nan)
+    grid[offsets % 7, offsets // 7] = totals
+    return grid
+
+
+def draw_calendar_heatmap(figure, year: int, grid: np.ndarray):
+    """
+    Draws the calendar heatmap of a year on a matplotlib Figure.
+    """
+    ax = figure.add_subplot()
+    image = ax.imshow(grid, aspect="auto", cmap="YlOrRd", interpolation="nearest")
+    ax.set_title(f"Daily Spend in {year}")
+    ax.set_yticks(range(7), labels=[calendar.day_abbr[day] for day in range(7)])
+
+    # One tick at the column of each month's first day
+    offset = date(year, 1, 1).weekday()
+    columns = [((date(year, month, 1) - date(year, 1, 1)).days + offset) // 7 for month in range(1, 13)]
+    ax.set_xticks(columns, labels=[calendar.month_abbr[month] for month in range(1, 13)])
+    figure.colorbar(image, ax=ax, label="Total Spent")
+    figure.tight_layout()
+
+
+@router.get("/calendar-heatmap")
+async def calendar_heatmap_chart(
+    year: int | None = Query(None, ge=1, le=9999),
+    options: ChartOptions = Depends(chart_options),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Generates a calendar heatmap of the spend of every day of a year.
+
+    Args:
+        year (int | None): Year to draw (defaults to the current year).
+        options (ChartOptions): format ("png" or "svg"), width and height in pixels.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Returns:
+        Response: Image of the calendar heatmap.
+    """
+    year = year or date.today().year
+
+    async def load_and_draw():
+        grid = await get_heatmap_data(db, year)
+        return lambda figure: draw_calendar_heatmap(figure, year, grid)
+
+    return await chart_response(db, ("calendar-heatmap", year), load_and_draw, options)
@@ -1,24 +1,44 @@
+from datetime import date
+
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.connection import get_db
+from app.database.connection import get_read_db
 from app.services.insights_service import generate_insights
+from app.services.result_cache import cached
 
 # Create a router for insights-related endpoints
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
 
 @router.get("/")
-def get_insights(db: Session = Depends(get_db)):
+async def get_insights(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Retrieve insights based on the user's expenses.
+    Results are cached per parameters until expenses or categories change.
 
     Args:
-        db (Session): SQLAlchemy database session (injected by Depends).
+        start_date (date | None): Only consider expenses on or after this date.
+        end_date (date | None): Only consider expenses on or before this date.
+        category_id (int | None): Only consider expenses of this category.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Returns:
         dict: A dictionary containing insights generated from the expenses.
     """
+    params = {"start_date": start_date, "end_date": end_date, "category_id": category_id}
+    insights = await cached(
+        db,
+        "/insights",
+        params,
+        lambda: generate_insights(db, start_date, end_date, category_id)
+    )
+
     return {
-        "insights": generate_insights(db)
+        "insights": insights
     }
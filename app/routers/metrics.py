@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+# Create a router for the Prometheus scrape endpoint
+router = APIRouter(tags=["Admin"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Exposes per-route metrics in Prometheus text format.
+
+    Histograms cover request latency (by status), SQL statements and SQL
+    time per request, and response size. Values are per worker process.
+
+    Returns:
+        PlainTextResponse: Prometheus text exposition.
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.connection import get_db
+from app.database.connection import get_async_db
 from app.database.models import Category
 from app.schemas.categories import CategoryCreate, CategoryResponse
 
@@ -13,14 +15,15 @@ router = APIRouter(
 
 
 @router.post("/", response_model=CategoryResponse)
-def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+async def create_category(category: CategoryCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new category.
-    Prevents duplicate categories.
+    Prevents duplicate categories through the unique name constraint, so
+    the insert is the only statement and concurrent duplicates still fail.
 
     Args:
         category (CategoryCreate): Category data from the request body.
-        db (Session): SQLAlchemy database session (injected by Depends).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Raises:
         HTTPException: If a category with the same name already exists.
@@ -29,37 +32,37 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
         Category: The newly created category.
     """
 
-    # Check if a category with the same name already exists
-    existing = db.query(Category).filter(Category.name == category.name).first()
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail="Category already exists"
-        )
-
     # Create a new category instance
     new_category = Category(
         name=category.name,
         essential=category.essential
     )
 
-    # Add and commit the new category to the database
+    # Add and commit the new category; a duplicate name conflicts on insert
     db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Category already exists"
+        )
 
+    # Attributes stay loaded after commit (expire_on_commit=False), no refresh needed
     return new_category
 
 
 @router.get("/", response_model=list[CategoryResponse])
-def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve all categories.
 
     Args:
-        db (Session): SQLAlchemy database session (injected by Depends).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Returns:
         list[Category]: List of all categories ordered by name.
     """
-    return db.query(Category).order_by(Category.name).all()
+    result = await db.scalars(select(Category).order_by(Category.name))
+    return result.all()
@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from sqlalchemy import and_
+from typing import Literal
+from sqlalchemy import select, tuple_
 
-from app.database.connection import get_db
+from app.database.connection import get_async_db
 from app.database.models import Expense, Category
 from app.schemas.expenses import (
     ExpenseCreate,
     ExpenseResponse,
-    ExpenseWithCategoryResponse
+    ExpenseWithCategoryResponse,
+    BulkExpenseResult
+)
+from app.services import category_cache
+from app.services.category_cache import UnknownCategoryError
+from app.services.expense_export import MEDIA_TYPES, ExportFormatUnavailable, export_stream
+from app.services.expense_ingest import BulkUploadError, ingest_expenses, record_stream
+from app.services.expense_search import MAX_QUERY_LENGTH, InvalidSearchError, description_matches
+from app.services.json_response import FastJSONResponse, rows_to_objects
+from app.services.pagination import (
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor
 )
 
 # Create a router for expense-related endpoints
@@ -18,19 +34,72 @@ router = APIRouter(
 )
 
 
+def filtered_expenses_query(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None
+):
+    """
+    Builds the expense listing query shared by the list and export endpoints.
+
+    Args:
+        start_date (date | None): Start date for filtering expenses.
+        end_date (date | None): End date for filtering expenses.
+        category_id (int | None): Filter expenses by category ID.
+
+    Returns:
+        Select: Expense columns (without the category name), not yet ordered.
+    """
+
+    # Build the base query; category names come from the category cache
+    # (or a join, for exports) rather than from every listing query
+    query = select(
+        Expense.id,
+        Expense.amount,
+        Expense.description,
+        Expense.expense_date,
+        Expense.category_id
+    )
+
+    # Filter by date range; each bound is a plain comparison on expense_date
+    # so the index (and, on PostgreSQL, partition pruning) applies
+    if start_date:
+        query = query.where(Expense.expense_date >= start_date)
+    if end_date:
+        query = query.where(Expense.expense_date <= end_date)
+
+    # Filter by category if provided; uncategorized expenses are never
+    # listed, as they have no category name
+    if category_id:
+        query = query.where(Expense.category_id == category_id)
+    else:
+        query = query.where(Expense.category_id.is_not(None))
+
+    return query
+
+
 @router.post("/", response_model=ExpenseResponse)
-def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
+async def create_expense(expense: ExpenseCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new expense in the database.
 
     Args:
         expense (ExpenseCreate): Data for the new expense from the request body.
-        db (Session): SQLAlchemy database session (injected by Depends).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: If the category does not exist.
 
     Returns:
         Expense: The newly created expense object.
     """
 
+    # Checked against the category cache, so a bad id never reaches the database
+    try:
+        await category_cache.require_category(db, expense.category_id)
+    except UnknownCategoryError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
     # Create a new Expense instance
     new_expense = Expense(
         amount=expense.amount,
@@ -41,59 +110,220 @@ def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
 
     # Add the expense to the database
     db.add(new_expense)
-    db.commit()
-    db.refresh(new_expense)
+    await db.commit()
+    await db.refresh(new_expense)
 
     return new_expense
 
 
+@router.post("/bulk", response_model=BulkExpenseResult)
+async def bulk_create_expenses(
+    request: Request,
+    mode: Literal["atomic", "skip"] = "atomic",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create many expenses from a single request body.
+
+    Accepts a JSON array (application/json), newline-delimited JSON
+    (application/x-ndjson) or CSV with a header row (text/csv). NDJSON and CSV
+    bodies are parsed while they stream in, and rows are written in large
+    batches (COPY on PostgreSQL, multi-row INSERT elsewhere).
+
+    Args:
+        request (Request): Incoming request, read as a stream.
+        mode (str): "atomic" rejects the whole upload if any row is invalid,
+            "skip" writes the valid rows and reports the invalid ones.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: 400 if the body cannot be parsed, 422 if an atomic upload has invalid rows.
+
+    Returns:
+        BulkExpenseResult: Counts of received, inserted and failed rows, with per-row errors.
+    """
+    records = record_stream(request.headers.get("content-type", ""), request.stream())
+
+    try:
+        result = await ingest_expenses(db, records, mode=mode)
+    except BulkUploadError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Nothing was written: report every row error to the client
+    if mode == "atomic" and result["failed"]:
+        raise HTTPException(status_code=422, detail=result)
+
+    return result
+
+
 @router.get("/", response_model=list[ExpenseWithCategoryResponse])
-def get_expenses(
+async def get_expenses(
     start_date: date | None = None,
     end_date: date | None = None,
     category_id: int | None = None,
-    limit: int = 50,
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve expenses with optional filters.
 
+    Results are ordered by (expense_date, id) descending and paginated with a
+    keyset cursor: when more rows are available, the X-Next-Cursor response
+    header holds the value to pass as `cursor` to fetch the next page.
+    Rows are encoded straight to JSON (amounts as exact strings) rather than
+    validated one by one into ExpenseWithCategoryResponse models.
+
     Args:
         start_date (date | None): Start date for filtering expenses.
         end_date (date | None): End date for filtering expenses.
         category_id (int | None): Filter expenses by category ID.
-        limit (int): Maximum number of results to return. Default is 50.
-        db (Session): SQLAlchemy database session (injected by Depends).
+        limit (int): Maximum number of results to return (1 to MAX_PAGE_SIZE). Default is 50.
+        cursor (str | None): Opaque cursor returned by the previous page.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: If the cursor is invalid.
 
     Returns:
         list[ExpenseWithCategoryResponse]: List of expenses with category information.
     """
 
-    # Build the base query joining Expense with Category
-    query = (
-        db.query(
-            Expense.id,
-            Expense.amount,
-            Expense.description,
-            Expense.expense_date,
-            Expense.category_id,
-            Category.name.label("category_name")
+    query = filtered_expenses_query(start_date, end_date, category_id)
+    return await paginated_response(db, query, limit, cursor)
+
+
+@router.get("/search", response_model=list[ExpenseWithCategoryResponse])
+async def search_expenses(
+    q: str = Query(..., min_length=1, max_length=MAX_QUERY_LENGTH),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Search expenses whose description contains every keyword of `q`.
+
+    Matching is case-insensitive and by substring ("super" finds
+    "Supermarket"). On PostgreSQL it uses the pg_trgm index on description.
+    Combines with the same filters, ordering and X-Next-Cursor pagination
+    as the expense list.
+
+    Args:
+        q (str): Keywords separated by spaces, e.g. "taxi airport".
+        start_date (date | None): Start date for filtering expenses.
+        end_date (date | None): End date for filtering expenses.
+        category_id (int | None): Filter expenses by category ID.
+        limit (int): Maximum number of results to return (1 to MAX_PAGE_SIZE). Default is 50.
+        cursor (str | None): Opaque cursor returned by the previous page.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: If the search string or the cursor is invalid.
+
+    Returns:
+        list[ExpenseWithCategoryResponse]: Matching expenses with category information.
+    """
+    try:
+        condition = description_matches(q)
+    except InvalidSearchError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    query = filtered_expenses_query(start_date, end_date, category_id).where(condition)
+    return await paginated_response(db, query, limit, cursor)
+
+
+async def paginated_response(db: AsyncSession, query, limit: int, cursor: str | None) -> FastJSONResponse:
+    """
+    Runs an expenses query one keyset page at a time.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        query (Select): Filtered expenses query, not yet ordered.
+        limit (int): Maximum number of rows in the page.
+        cursor (str | None): Opaque cursor returned by the previous page.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+
+    Returns:
+        FastJSONResponse: The page, with X-Next-Cursor set when more rows exist.
+    """
+
+    # Resume after the last row of the previous page
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+        except InvalidCursorError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        query = query.where(
+            tuple_(Expense.expense_date, Expense.id) < tuple_(last_date, last_id)
         )
-        .join(Category)
+
+    # Order by most recent expenses (id breaks ties) and fetch one extra row
+    # to know whether another page exists
+    result = await db.execute(
+        query.order_by(Expense.expense_date.desc(), Expense.id.desc())
+        .limit(limit + 1)
     )
+    rows = result.all()
 
-    # Filter by date range if both start_date and end_date are provided
-    if start_date and end_date:
-        query = query.filter(
-            and_(
-                Expense.expense_date >= start_date,
-                Expense.expense_date <= end_date
-            )
-        )
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].expense_date, rows[-1].id)
 
-    # Filter by category if provided
-    if category_id:
-        query = query.filter(Expense.category_id == category_id)
+    # Attach category names from the cache instead of joining categories
+    names = await category_cache.get_names(db, {row.category_id for row in rows})
+    columns = (*result.keys(), "category_name")
+    rows = [(*row, names.get(row.category_id)) for row in rows]
+
+    return FastJSONResponse(rows_to_objects(columns, rows), headers=headers)
+
+
+@router.get("/export")
+def export_expenses(
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None
+):
+    """
+    Export every expense matching the filters as CSV, NDJSON or Parquet.
 
-    # Order by most recent expenses and apply limit
-    return query.order_by(Expense.expense_date.desc()).limit(limit).all()
+    Rows are read from a server-side cursor in fixed-size chunks and sent as
+    they are encoded, so memory use stays constant and the download starts
+    immediately regardless of the number of rows.
+
+    Args:
+        format (str): "csv", "ndjson" or "parquet" (requires pyarrow).
+        start_date (date | None): Start date for filtering expenses.
+        end_date (date | None): End date for filtering expenses.
+        category_id (int | None): Filter expenses by category ID.
+
+    Raises:
+        HTTPException: 501 if the format's optional dependency is not installed.
+
+    Returns:
+        StreamingResponse: The encoded expenses.
+    """
+    query = (
+        filtered_expenses_query(start_date, end_date, category_id)
+        .join(Category, Category.id == Expense.category_id)
+        .add_columns(Category.name.label("category_name"))
+        .order_by(Expense.expense_date.desc(), Expense.id.desc())
+    )
+
+    try:
+        stream = export_stream(query, format)
+    except ExportFormatUnavailable as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'}
+    )
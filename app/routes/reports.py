@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from datetime import date, datetime
+from typing import Literal
 
-from app.database.connection import get_db
-from app.database.models import Expense, Category
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.connection import get_read_db
+from app.services import aggregation, analytics_engine, category_cache, distributions, report_jobs, timeseries
+from app.services.data_version import current_version
+from app.services.json_response import FastJSONResponse
+from app.services.result_cache import cached
 from app.schemas.reports import (
     MonthlyExpenseReport,
     CategoryExpenseReport,
-    DailyExpenseReport
+    DailyExpenseReport,
+    BreakdownRow,
+    DistributionRow,
+    TimeseriesReport,
+    ReportJobRequest,
+    ReportJob
 )
 
 # Create a router for report-related endpoints
@@ -18,85 +30,432 @@ router = APIRouter(
 
 
 @router.get("/monthly", response_model=list[MonthlyExpenseReport])
-def monthly_expenses(db: Session = Depends(get_db)):
+async def monthly_expenses(db: AsyncSession = Depends(get_read_db)):
     """
     Returns total expenses grouped by month.
+    Reads the (month, category) rollup table instead of scanning expenses,
+    and caches the result until expenses or categories change.
+    Totals are encoded as exact two-decimal strings.
 
     Args:
-        db (Session): SQLAlchemy database session (injected by Depends).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Returns:
         list[MonthlyExpenseReport]: List of total expenses per month.
     """
+    return FastJSONResponse(await cached(db, "/reports/monthly", {}, lambda: _monthly_expenses(db)))
 
-    results = (
-        db.query(
-            func.to_char(func.date_trunc("month", Expense.expense_date), "YYYY-MM")
-            .label("month"),
-            func.sum(Expense.amount).label("total")
-        )
-        .group_by("month")
-        .order_by("month")
-        .all()
-    )
 
-    return results
+async def _monthly_expenses(db: AsyncSession) -> list[dict]:
+    """
+    Computes the monthly report (served from the rollup table).
+    """
+    return [
+        {
+            "month": row.period.strftime("%Y-%m"),
+            "total": row.total
+        }
+        for row in await aggregation.aggregate(db, granularity="month")
+    ]
 
 
 @router.get("/by-category", response_model=list[CategoryExpenseReport])
-def expenses_by_category(db: Session = Depends(get_db)):
+async def expenses_by_category(db: AsyncSession = Depends(get_read_db)):
     """
     Returns total expenses grouped by category.
+    Reads the (month, category) rollup table instead of scanning expenses,
+    and caches the result until expenses or categories change.
+    Totals are encoded as exact two-decimal strings.
 
     Args:
-        db (Session): SQLAlchemy database session (injected by Depends).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Returns:
         list[CategoryExpenseReport]: List of total expenses per category.
     """
+    return FastJSONResponse(await cached(db, "/reports/by-category", {}, lambda: _expenses_by_category(db)))
 
-    results = (
-        db.query(
-            Category.name.label("category"),
-            func.sum(Expense.amount).label("total")
-        )
-        .join(Expense)
-        .group_by(Category.name)
-        .order_by(func.sum(Expense.amount).desc())
-        .all()
-    )
 
-    return results
+async def _expenses_by_category(db: AsyncSession) -> list[dict]:
+    """
+    Computes the per-category report (served from the rollup table).
+    """
+    rows = await aggregation.aggregate(db, dimension="category")
+    names = await category_cache.get_names(db)
+
+    # Uncategorized expenses are left out, as they have no category name
+    return [
+        {
+            "category": names[row.key],
+            "total": row.total
+        }
+        for row in sorted(rows, key=lambda row: row.total, reverse=True)
+        if row.key in names
+    ]
 
 
 @router.get("/daily", response_model=list[DailyExpenseReport])
-def most_expensive_days(db: Session = Depends(get_db)):
+async def most_expensive_days(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Returns the days with the highest total expenses.
+    The result is cached until expenses or categories change, and is computed
+    from the in-memory analytics snapshot when ANALYTICS_ENGINE is enabled.
+    Totals are encoded as exact two-decimal strings.
 
     Args:
-        db (Session): SQLAlchemy database session (injected by Depends).
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
 
     Returns:
         list[DailyExpenseReport]: Top 10 days with the highest total expenses.
     """
+    params = {"start_date": start_date, "end_date": end_date}
+    days = await cached(db, "/reports/daily", params, lambda: _most_expensive_days(db, start_date, end_date))
+    return FastJSONResponse(days)
 
-    results = (
-        db.query(
-            Expense.expense_date.label("date"),
-            func.sum(Expense.amount).label("total")
-        )
-        .group_by(Expense.expense_date)
-        .order_by(func.sum(Expense.amount).desc())
-        .limit(10)
-        .all()
-    )
+
+async def _most_expensive_days(db: AsyncSession, start_date: date | None, end_date: date | None) -> list[dict]:
+    """
+    Computes the top 10 days (from the expenses table, or the analytics snapshot).
+    """
+    rows = await aggregation.aggregate(db, granularity="day", start_date=start_date, end_date=end_date, top=10)
 
     # Convert results to a JSON-friendly format
     return [
         {
-            "date": row.date.isoformat(),
-            "total": float(row.total)
+            "date": row.period.isoformat(),
+            "total": row.total
         }
-        for row in results
+        for row in rows
     ]
+
+
+@router.get("/breakdown", response_model=list[BreakdownRow])
+async def expense_breakdown(
+    group_by: Literal["day", "weekday", "month", "year", "category"] = "month",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: list[int] | None = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Returns expense totals and counts grouped by an arbitrary dimension.
+    Served from the in-memory analytics snapshot, so any date range and
+    combination of categories is answered without scanning the database.
+
+    Args:
+        group_by (str): "day", "weekday", "month", "year" or "category".
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        category_id (list[int] | None): Only include these categories (repeatable).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Returns:
+        list[BreakdownRow]: Total and count per group, ordered by group.
+    """
+    snapshot = await analytics_engine.get_snapshot(db)
+    groups = snapshot.aggregate(group_by, start_date, end_date, category_id)
+
+    if group_by == "category":
+        names = await category_cache.get_names(db)
+        labels = {key: names.get(key, "Uncategorized") for key, _, _ in groups}
+    else:
+        labels = {key: analytics_engine.format_key(group_by, key) for key, _, _ in groups}
+
+    return FastJSONResponse([
+        {
+            "key": labels[key],
+            "total": analytics_engine.from_cents(cents),
+            "count": count
+        }
+        for key, cents, count in groups
+    ])
+
+
+@router.get("/timeseries", response_model=TimeseriesReport)
+async def expense_timeseries(
+    granularity: Literal["day", "week", "month"] = "day",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Returns spend per day, week or month with 7 and 30-day moving averages,
+    month-to-date spend against the same days of last month, and an
+    end-of-month projection at the trailing 30-day rate.
+    Computed with NumPy over a dense daily series loaded by one aggregate
+    query, and cached until expenses or categories change.
+
+    Args:
+        granularity (str): "day", "week" or "month".
+        start_date (date | None): First day to include (defaults to one year before end_date).
+        end_date (date | None): Last day to include and month-to-date reference (defaults to today).
+        category_id (int | None): Only include this category.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: If start_date is after end_date, or end_date is in January of year 1.
+
+    Returns:
+        TimeseriesReport: Points, month_to_date and projection.
+    """
+    end_date = end_date or date.today()
+    if start_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    if end_date < timeseries.FIRST_END_DATE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"end_date must not be before {timeseries.FIRST_END_DATE.isoformat()}"
+        )
+
+    params = {
+        "granularity": granularity,
+        "start_date": start_date,
+        "end_date": end_date,
+        "category_id": category_id,
+    }
+    return FastJSONResponse(await cached(
+        db,
+        "/reports/timeseries",
+        params,
+        lambda: timeseries.build_timeseries(db, granularity, start_date, end_date, category_id)
+    ))
+
+
+# Percentiles reported by /reports/distribution
+DISTRIBUTION_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def parse_month(value: str | None) -> date | None:
+    """
+    Parses an optional "YYYY-MM" query parameter into the first day of that month.
+    """
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid month {value!r}, expected YYYY-MM")
+
+
+@router.get("/distribution", response_model=list[DistributionRow])
+async def expense_distribution(
+    group_by: Literal["category", "month", "total"] = "category",
+    start_month: str | None = None,
+    end_month: str | None = None,
+    category_id: list[int] | None = Query(None),
+    bins: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Returns the median, p90, p99 and a histogram of expense amounts per group.
+    Merges the amount sketches kept per (month, category), so any month
+    range is answered without scanning expenses. Percentiles are within 1%
+    of the exact value (percentile_cont); histogram counts are exact.
+    The result is cached until expenses or categories change.
+
+    Args:
+        group_by (str): "category", "month" or "total".
+        start_month (str | None): First month to include ("YYYY-MM").
+        end_month (str | None): Last month to include ("YYYY-MM").
+        category_id (list[int] | None): Only include these categories (repeatable).
+        bins (int): Maximum number of histogram bins per group.
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: If a month is not in YYYY-MM format.
+
+    Returns:
+        list[DistributionRow]: Distribution per group, ordered by group.
+    """
+    start, end = parse_month(start_month), parse_month(end_month)
+    params = {
+        "group_by": group_by,
+        "start_month": start,
+        "end_month": end,
+        "category_id": ",".join(map(str, sorted(category_id))) if category_id else None,
+        "bins": bins,
+    }
+    return FastJSONResponse(await cached(
+        db,
+        "/reports/distribution",
+        params,
+        lambda: _expense_distribution(db, group_by, start, end, category_id, bins)
+    ))
+
+
+async def _expense_distribution(
+    db: AsyncSession,
+    group_by: str,
+    start_month: date | None,
+    end_month: date | None,
+    category_ids: list[int] | None,
+    bins: int
+) -> list[dict]:
+    """
+    Computes the distribution report by merging the stored sketches.
+    """
+    results = await db.execute(distributions.sketch_query(group_by, start_month, end_month, category_ids))
+    sketches = distributions.merge_rows(results, has_key=group_by != "total")
+
+    if group_by == "category":
+        names = await category_cache.get_names(db)
+        labels = {key: names.get(key, "Uncategorized") for key in sketches}
+    elif group_by == "month":
+        labels = {key: key.strftime("%Y-%m") for key in sketches}
+    else:
+        labels = {None: "total"}
+
+    rows = []
+    for key, sketch in sketches.items():
+        p50, p90, p99 = sketch.quantiles(DISTRIBUTION_QUANTILES)
+        rows.append({
+            "key": labels[key],
+            "count": sketch.count,
+            "p50": distributions.to_money(p50),
+            "p90": distributions.to_money(p90),
+            "p99": distributions.to_money(p99),
+            "histogram": [
+                {
+                    "lower": distributions.to_money(lower),
+                    "upper": distributions.to_money(upper),
+                    "count": count
+                }
+                for lower, upper, count in sketch.histogram(bins)
+            ]
+        })
+    return rows
+
+
+def job_endpoint_paths(app) -> set[str]:
+    """
+    Returns the GET endpoints (without path parameters) that jobs may run.
+
+    Read from the (cached) OpenAPI schema, which lists the routes of every
+    included router.
+    """
+    prefixes = tuple(report_jobs.JOB_PREFIXES.values())
+    return {
+        path for path, operations in app.openapi()["paths"].items()
+        if "get" in operations and path.startswith(prefixes) and "{" not in path
+    }
+
+
+def job_status(job: report_jobs.Job) -> dict:
+    """
+    Describes a job; finished report and insight jobs include their JSON result.
+    """
+    status = job.status
+    description = {
+        "id": job.id,
+        "kind": job.kind,
+        "endpoint": f"{job.path}?{job.query}" if job.query else job.path,
+        "status": status,
+        "submissions": job.submissions,
+        "result_url": f"/reports/jobs/{job.id}/result",
+    }
+    if status in (report_jobs.DONE, report_jobs.FAILED):
+        _, media_type, body = job.result()
+        content = orjson.loads(body) if media_type.startswith("application/json") else None
+        if status == report_jobs.FAILED:
+            description["error"] = content.get("detail", content) if isinstance(content, dict) else body.decode()
+        elif content is not None:
+            description["result"] = content
+    return description
+
+
+@router.post("/jobs", response_model=ReportJob, status_code=202)
+async def create_report_job(
+    job: ReportJobRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Queues a report, insight or chart computation on the job process pool.
+    The job runs the same GET endpoint in a worker process, so long ranges
+    and multi-chart renders do not tie up request workers. Identical jobs
+    (same endpoint, parameters and data version) are deduplicated: a
+    pending or recently finished job is returned instead of a new one, so a
+    burst of identical dashboard loads costs one computation.
+
+    Jobs live in memory of the API worker process that accepted them: the
+    returned id is unknown to other workers (and lost on restart), so it
+    must be polled on the same process. At most REPORT_JOB_MAX_JOBS jobs
+    are kept per worker; finished ones expire after REPORT_JOB_TTL.
+
+    Args:
+        job (ReportJobRequest): Kind, endpoint name and its query parameters.
+        request (Request): Incoming request (used to look up the endpoints).
+        db (AsyncSession): SQLAlchemy async database session (injected by Depends).
+
+    Raises:
+        HTTPException: 400 if no such report, insight or chart exists,
+            429 if REPORT_JOB_MAX_JOBS jobs are already pending.
+
+    Returns:
+        ReportJob: The queued (or shared) job, to poll at /reports/jobs/{id}.
+    """
+    path = report_jobs.JOB_PREFIXES[job.kind] + "/" + job.name.strip("/")
+    if path not in job_endpoint_paths(request.app):
+        raise HTTPException(status_code=400, detail=f"Unknown {job.kind} {job.name!r}")
+
+    version = await db.run_sync(current_version)
+    try:
+        queued = report_jobs.submit(job.kind, path, job.params, version)
+    except report_jobs.JobQueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return FastJSONResponse(job_status(queued), status_code=202)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJob)
+async def get_report_job(job_id: str):
+    """
+    Returns the status of a background job, with its result once it is done
+    (JSON reports and insights inline; every result, images included, raw
+    at result_url). Jobs are kept REPORT_JOB_TTL seconds after finishing,
+    and only in the API worker process that accepted them.
+
+    Args:
+        job_id (str): Id returned by POST /reports/jobs.
+
+    Raises:
+        HTTPException: If the job does not exist or has expired.
+
+    Returns:
+        ReportJob: Status of the job.
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job_status(job))
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_report_job_result(job_id: str):
+    """
+    Returns the raw result of a finished job: the response the endpoint
+    produced (JSON or image), with its status code and content type.
+
+    Args:
+        job_id (str): Id returned by POST /reports/jobs.
+
+    Raises:
+        HTTPException: 404 if the job does not exist or has expired, 409 if it has not finished.
+
+    Returns:
+        Response: The endpoint's response.
+    """
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job.future.done():
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    status_code, media_type, body = job.result()
+    return Response(content=body, status_code=status_code, media_type=media_type)
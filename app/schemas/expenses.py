@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
 from decimal import Decimal
 
@@ -6,8 +6,11 @@ from decimal import Decimal
 class ExpenseCreate(BaseModel):
     """
     Data that the client must provide to create a new expense.
+
+    The amount must fit the Numeric(10, 2) column: at most two decimals
+    and eight integer digits.
     """
-    amount: Decimal
+    amount: Decimal = Field(max_digits=10, decimal_places=2)
     description: str | None = None
     expense_date: date
     category_id: int
@@ -40,3 +43,33 @@ class ExpenseWithCategoryResponse(BaseModel):
 
     class Config:
         orm_mode = True  # Allows returning ORM objects directly
+
+
+class BulkRowError(BaseModel):
+    """
+    Validation error for a single row of a bulk upload.
+
+    Attributes:
+        row (int): 1-based position of the row in the uploaded body (CSV header excluded).
+        error (str): Human readable reason why the row was rejected.
+    """
+    row: int
+    error: str
+
+
+class BulkExpenseResult(BaseModel):
+    """
+    Summary returned by the bulk expense upload endpoint.
+
+    Attributes:
+        mode (str): "atomic" (all-or-nothing) or "skip" (bad rows are ignored).
+        received (int): Number of rows read from the request body.
+        inserted (int): Number of rows written to the database.
+        failed (int): Number of rows rejected during validation.
+        errors (list[BulkRowError]): Per-row errors (capped to keep responses small).
+    """
+    mode: str
+    received: int
+    inserted: int
+    failed: int
+    errors: list[BulkRowError]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from decimal import Decimal
+from typing import Any, Literal
 
 
 class MonthlyExpenseReport(BaseModel):
@@ -36,3 +37,161 @@ class DailyExpenseReport(BaseModel):
     """
     date: str
     total: Decimal
+
+
+class BreakdownRow(BaseModel):
+    """
+    Represents the total and number of expenses of one group in a breakdown.
+
+    Attributes:
+        key (str): Group label: a date, weekday name, "YYYY-MM", year or category name.
+        total (Decimal): Total amount of expenses in the group.
+        count (int): Number of expenses in the group.
+    """
+    key: str
+    total: Decimal
+    count: int
+
+
+class HistogramBin(BaseModel):
+    """
+    Number of expenses with an amount in (lower, upper].
+
+    Attributes:
+        lower (Decimal): Lower bound of the bin (exclusive).
+        upper (Decimal): Upper bound of the bin (inclusive).
+        count (int): Number of expenses in the bin.
+    """
+    lower: Decimal
+    upper: Decimal
+    count: int
+
+
+class DistributionRow(BaseModel):
+    """
+    Represents the distribution of expense amounts of one group.
+
+    Percentiles are estimates within 1% of the exact value.
+
+    Attributes:
+        key (str): Group label: a category name, "YYYY-MM" or "total".
+        count (int): Number of expenses in the group.
+        p50 (Decimal): Median expense amount.
+        p90 (Decimal): 90th percentile of expense amounts.
+        p99 (Decimal): 99th percentile of expense amounts.
+        histogram (list[HistogramBin]): Logarithmically spaced amount bins.
+    """
+    key: str
+    count: int
+    p50: Decimal
+    p90: Decimal
+    p99: Decimal
+    histogram: list[HistogramBin]
+
+
+class TimeseriesPoint(BaseModel):
+    """
+    Spend of one period of a time series.
+
+    Attributes:
+        period (str): Period start: "YYYY-MM-DD" for days and weeks (Monday), "YYYY-MM" for months.
+        total (Decimal): Total amount of expenses in the period.
+        ma7 (Decimal): Average daily spend over the 7 days ending on the period's last day.
+        ma30 (Decimal): Average daily spend over the 30 days ending on the period's last day.
+    """
+    period: str
+    total: Decimal
+    ma7: Decimal | None
+    ma30: Decimal | None
+
+
+class MonthToDate(BaseModel):
+    """
+    Spend of the current month so far, compared with the same days of the previous month.
+
+    Attributes:
+        as_of (str): Last day included ("YYYY-MM-DD").
+        total (Decimal): Spend from the first of the month to as_of.
+        previous_period_total (Decimal): Spend over the same days of the previous month.
+        change_pct (float | None): Change in percent (None when the previous period is empty).
+    """
+    as_of: str
+    total: Decimal
+    previous_period_total: Decimal
+    change_pct: float | None
+
+
+class MonthProjection(BaseModel):
+    """
+    Projected spend at the end of the month, at the trailing 30-day daily rate.
+
+    Attributes:
+        month (str): Projected month ("YYYY-MM").
+        daily_rate (Decimal): Average daily spend over the last 30 days.
+        days_remaining (int): Days left in the month after as_of.
+        projected_total (Decimal): Month-to-date spend plus daily_rate for each remaining day.
+    """
+    month: str
+    daily_rate: Decimal | None
+    days_remaining: int
+    projected_total: Decimal | None
+
+
+class TimeseriesReport(BaseModel):
+    """
+    Spend over time with moving averages, month-to-date comparison and projection.
+
+    Attributes:
+        granularity (str): "day", "week" or "month".
+        start_date (str): First day of the first period.
+        end_date (str): Last day included.
+        points (list[TimeseriesPoint]): Spend per period, in order.
+        month_to_date (MonthToDate): Current month so far vs. the previous month.
+        projection (MonthProjection): End-of-month projection.
+    """
+    granularity: str
+    start_date: str
+    end_date: str
+    points: list[TimeseriesPoint]
+    month_to_date: MonthToDate
+    projection: MonthProjection
+
+
+class ReportJobRequest(BaseModel):
+    """
+    Report, insight or chart to compute in the background.
+
+    Attributes:
+        kind (str): "report", "insight" or "chart".
+        name (str): Endpoint under /reports, /charts (e.g. "timeseries",
+            "daily-spend"); empty for insights.
+        params (dict): Query parameters of that endpoint; lists are repeated parameters.
+    """
+    kind: Literal["report", "insight", "chart"]
+    name: str = ""
+    params: dict[str, Any] = {}
+
+
+class ReportJob(BaseModel):
+    """
+    State of a background report job.
+
+    Attributes:
+        id (str): Job id, polled at /reports/jobs/{id}.
+        kind (str): "report", "insight" or "chart".
+        endpoint (str): Endpoint computed, with its canonical query string.
+        status (str): "queued" (waiting for a free worker), "running" (started
+            by a worker), "done" or "failed".
+        submissions (int): Requests served by this job, identical ones deduplicated onto it.
+        result_url (str): Where the raw result (JSON or image) is served once finished.
+        result (Any | None): JSON result of a finished report or insight job.
+        error (Any | None): Error detail of a failed job.
+    """
+    id: str
+    kind: str
+    endpoint: str
+    status: str
+    submissions: int
+    result_url: str
+    result: Any | None = None
+    error: Any | None = None
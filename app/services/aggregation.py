@@ -0,0 +1,431 @@
+import calendar
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import Date, Integer, cast, func, literal, literal_column, null, select, tuple_, type_coerce, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.models import Category, Expense, ExpenseRollup
+from app.services import analytics_engine
+from app.services.rollups import UNCATEGORIZED, month_start, month_start_sql
+
+# Period sizes rows can be grouped by (None: no period)
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+
+# Attributes rows can be grouped by (None: no dimension)
+DIMENSIONS = ("category", "essential")
+
+# Metrics that can be computed per group
+METRICS = ("total", "count", "min", "max")
+
+# Granularities the monthly rollups can answer
+ROLLUP_GRANULARITIES = (None, "month", "quarter", "year")
+
+# Granularities the analytics snapshot can answer (no dimension)
+SNAPSHOT_GRANULARITIES = (None, "day", "month", "year")
+
+
+class Grouping(NamedTuple):
+    """
+    One way of grouping the aggregated expenses.
+
+    Attributes:
+        granularity (str | None): One of GRANULARITIES, or None.
+        dimension (str | None): One of DIMENSIONS, or None.
+    """
+    granularity: str | None = None
+    dimension: str | None = None
+
+
+class AggregateRow(NamedTuple):
+    """
+    Metrics of one group. Metrics that were not requested are None.
+
+    Attributes:
+        period (date | None): First day of the period (None without granularity).
+        key (int | bool | None): Category id (0 for uncategorized) or essential
+            flag (None for uncategorized); None without dimension.
+        total (Decimal | None): Sum of the amounts.
+        count (int | None): Number of expenses.
+        min_amount (Decimal | None): Smallest amount.
+        max_amount (Decimal | None): Largest amount.
+    """
+    period: date | None
+    key: int | bool | None
+    total: object = None
+    count: int | None = None
+    min_amount: object = None
+    max_amount: object = None
+
+
+def covers_whole_months(start_date: date | None, end_date: date | None) -> bool:
+    """
+    Returns True when a date range starts and ends on month boundaries.
+
+    Such ranges can be answered from the monthly rollups; others need the
+    expenses table.
+    """
+    starts_on_boundary = start_date is None or start_date.day == 1
+    ends_on_boundary = end_date is None or end_date.day == calendar.monthrange(end_date.year, end_date.month)[1]
+    return starts_on_boundary and ends_on_boundary
+
+
+def period_start_sql(dialect_name: str, granularity: str, column):
+    """
+    SQL expression of the first day of the period a date column falls in.
+
+    Weeks start on Monday (ISO). Constants are rendered inline so the same
+    expression can appear in both SELECT and GROUP BY with server-side binds.
+
+    Args:
+        dialect_name (str): Name of the database dialect.
+        granularity (str): One of GRANULARITIES.
+        column (ColumnElement): Date column.
+
+    Raises:
+        NotImplementedError: For unsupported databases.
+
+    Returns:
+        ColumnElement: Date expression.
+    """
+    if granularity == "day":
+        return column
+    if granularity == "month":
+        return month_start_sql(dialect_name, column)
+
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(literal_column(f"'{granularity}'"), column), Date)
+
+    if dialect_name == "sqlite":
+        if granularity == "week":
+            # Next Sunday (or the same day), minus six days
+            expression = func.date(column, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+        elif granularity == "quarter":
+            months_into_quarter = (
+                cast(func.strftime(literal_column("'%m'"), column), Integer) - literal_column("1")
+            ) % literal_column("3")
+            expression = func.date(
+                column,
+                literal_column("'start of month'"),
+                func.printf(literal_column("'-%d months'"), months_into_quarter)
+            )
+        else:
+            expression = func.date(column, literal_column("'start of year'"))
+        return type_coerce(expression, Date)
+
+    if dialect_name in ("mysql", "mariadb"):
+        # MySQL drivers interpolate parameters client-side, so bound values are safe
+        if granularity == "week":
+            return func.subdate(column, func.weekday(column))
+        if granularity == "quarter":
+            return func.str_to_date(
+                func.concat(func.year(column), "-", (func.quarter(column) - 1) * 3 + 1, "-01"),
+                "%Y-%c-%d"
+            )
+        return func.makedate(func.year(column), 1)
+
+    raise NotImplementedError(f"Aggregations are not supported on {dialect_name}")
+
+
+def _source(dialect_name: str, groupings: list[Grouping], start_date, end_date, category_ids):
+    """
+    Picks the table to aggregate and builds its expressions and filters.
+
+    Whole-month ranges grouped by month or coarser read the rollup table;
+    anything else reads expenses. Either way the date range is a plain
+    range predicate on the stored column, so its index applies.
+    """
+    if all(grouping.granularity in ROLLUP_GRANULARITIES for grouping in groupings) \
+            and covers_whole_months(start_date, end_date):
+        table = ExpenseRollup.__table__
+        date_column = ExpenseRollup.month
+        category = ExpenseRollup.category_id
+        metrics = {
+            "total": func.sum(ExpenseRollup.total),
+            "count": func.sum(ExpenseRollup.count),
+            "min": func.min(ExpenseRollup.min_amount),
+            "max": func.max(ExpenseRollup.max_amount),
+        }
+        category_key = category
+        filters = []
+        if start_date:
+            filters.append(ExpenseRollup.month >= start_date)
+        if end_date:
+            filters.append(ExpenseRollup.month <= month_start(end_date))
+    else:
+        table = Expense.__table__
+        date_column = Expense.expense_date
+        category = Expense.category_id
+        metrics = {
+            "total": func.sum(Expense.amount),
+            "count": func.count(),
+            "min": func.min(Expense.amount),
+            "max": func.max(Expense.amount),
+        }
+        category_key = func.coalesce(category, literal_column(str(UNCATEGORIZED)))
+        filters = []
+        if start_date:
+            filters.append(Expense.expense_date >= start_date)
+        if end_date:
+            filters.append(Expense.expense_date <= end_date)
+
+    if category_ids:
+        filters.append(category.in_(category_ids))
+
+    def period(granularity):
+        if granularity == "month" and table is ExpenseRollup.__table__:
+            return date_column
+        return period_start_sql(dialect_name, granularity, date_column)
+
+    dimensions = {"category": category_key, "essential": Category.essential}
+    needs_category = any(grouping.dimension == "essential" for grouping in groupings)
+    return table, category, period, dimensions, metrics, filters, needs_category
+
+
+def _snapshot_supported(groupings: list[Grouping], metrics: tuple[str, ...]) -> bool:
+    """
+    Returns True when the analytics snapshot can answer every grouping.
+    """
+    return all(
+        (grouping.dimension is None and grouping.granularity in SNAPSHOT_GRANULARITIES)
+        or (grouping.dimension == "category" and grouping.granularity is None)
+        for grouping in groupings
+    ) and set(metrics) <= {"total", "count"}
+
+
+def _snapshot_period(granularity: str | None, key: int) -> date | None:
+    """
+    Converts a snapshot aggregate key to the first day of its period.
+    """
+    if granularity == "day":
+        return analytics_engine.from_day(key)
+    if granularity == "month":
+        return date(1970 + key // 12, key % 12 + 1, 1)
+    if granularity == "year":
+        return date(1970 + key, 1, 1)
+    return None
+
+
+async def _snapshot_aggregate(db, groupings, start_date, end_date, category_ids, metrics, top) -> dict:
+    """
+    Answers the groupings from the in-memory analytics snapshot.
+    """
+    snapshot = await analytics_engine.get_snapshot(db)
+    results = {}
+    for grouping in groupings:
+        group_by = grouping.dimension or grouping.granularity
+        rows = []
+        for key, cents, count in snapshot.aggregate(group_by, start_date, end_date, category_ids):
+            if group_by is None and not count:
+                continue
+            rows.append(AggregateRow(
+                period=_snapshot_period(grouping.granularity, key),
+                key=key if grouping.dimension else None,
+                total=analytics_engine.from_cents(cents) if "total" in metrics else None,
+                count=int(count) if "count" in metrics else None,
+            ))
+        results[grouping] = rows
+    return results if top is None else _largest(results, top)
+
+
+async def aggregate_many(
+    db: AsyncSession,
+    groupings: list[Grouping],
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_ids: list[int] | None = None,
+    metrics: tuple[str, ...] = ("total",),
+    top: int | None = None
+) -> dict[Grouping, list[AggregateRow]]:
+    """
+    Aggregates expenses under several groupings in a single statement.
+
+    On PostgreSQL one GROUPING SETS query scans the data once; other
+    databases get the equivalent UNION ALL. The monthly rollups are read
+    whenever the range is month-aligned and no grouping is finer than a
+    month. Otherwise the expenses table is read, or the in-memory analytics
+    snapshot when ANALYTICS_ENGINE is enabled and it supports the request.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        groupings (list[Grouping]): Groupings to compute.
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        category_ids (list[int] | None): Only include these categories.
+        metrics (tuple[str, ...]): Metrics to compute, from METRICS.
+        top (int | None): Only return this many groups with the largest
+            totals, largest first (single grouping only).
+
+    Raises:
+        ValueError: For an unknown granularity, dimension or metric.
+
+    Returns:
+        dict[Grouping, list[AggregateRow]]: Rows per grouping, ordered by period
+        and key (or by total with top).
+    """
+    for grouping in groupings:
+        if grouping.granularity is not None and grouping.granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {grouping.granularity!r}")
+        if grouping.dimension is not None and grouping.dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {grouping.dimension!r}")
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+    if top is not None and (len(groupings) != 1 or "total" not in metrics):
+        raise ValueError("top needs a single grouping and the total metric")
+
+    uses_rollups = covers_whole_months(start_date, end_date) and all(
+        grouping.granularity in ROLLUP_GRANULARITIES for grouping in groupings
+    )
+    if settings.analytics_engine and not uses_rollups and _snapshot_supported(groupings, metrics):
+        return await _snapshot_aggregate(db, groupings, start_date, end_date, category_ids, metrics, top)
+
+    dialect_name = db.get_bind().dialect.name
+    table, category, period, dimensions, metric_columns, filters, needs_category = _source(
+        dialect_name, groupings, start_date, end_date, category_ids
+    )
+    metric_labels = [metric_columns[name].label(name) for name in metrics]
+
+    def base(*columns):
+        stmt = select(*columns, *metric_labels).select_from(table)
+        if needs_category:
+            stmt = stmt.outerjoin(Category, Category.id == category)
+        return stmt.where(*filters)
+
+    if dialect_name == "postgresql" and len(groupings) > 1:
+        periods = {g.granularity: period(g.granularity) for g in groupings if g.granularity}
+        keys = {g.dimension: dimensions[g.dimension] for g in groupings if g.dimension}
+        columns = [*periods.values(), *keys.values()]
+        labelled = [
+            *(expression.label(f"period_{name}") for name, expression in periods.items()),
+            *(expression.label(f"key_{name}") for name, expression in keys.items()),
+        ]
+        sets = [
+            tuple_(*[
+                expression for expression in (
+                    periods.get(grouping.granularity), keys.get(grouping.dimension)
+                ) if expression is not None
+            ])
+            for grouping in groupings
+        ]
+        stmt = base(*labelled, func.grouping(*columns).label("grouping_id")).group_by(func.grouping_sets(*sets))
+        rows = (await db.execute(stmt)).all()
+
+        # grouping() sets the bit of each column absent from the row's grouping set
+        masks = {}
+        for grouping in groupings:
+            present = {periods.get(grouping.granularity), keys.get(grouping.dimension)}
+            masks[sum(
+                1 << (len(columns) - 1 - position)
+                for position, column in enumerate(columns) if column not in present
+            )] = grouping
+        results = {grouping: [] for grouping in groupings}
+        for row in rows:
+            grouping = masks[row.grouping_id]
+            results[grouping].append(_to_row(
+                row._mapping,
+                f"period_{grouping.granularity}" if grouping.granularity else None,
+                f"key_{grouping.dimension}" if grouping.dimension else None,
+                metrics
+            ))
+    else:
+        # Typed NULLs, so results are converted the same whichever grouping comes first
+        key_type = next((dimensions[g.dimension].type for g in groupings if g.dimension), Integer())
+        selects = []
+        for index, grouping in enumerate(groupings):
+            period_column = period(grouping.granularity) if grouping.granularity else None
+            key_column = dimensions[grouping.dimension] if grouping.dimension else None
+            stmt = base(
+                (period_column if period_column is not None else type_coerce(null(), Date)).label("period"),
+                (key_column if key_column is not None else type_coerce(null(), key_type)).label("key"),
+                literal(index).label("grouping_id")
+            )
+            group_by = [column for column in (period_column, key_column) if column is not None]
+            selects.append(stmt.group_by(*group_by) if group_by else stmt)
+
+        if top is not None:
+            stmt = selects[0].order_by(metric_columns["total"].desc()).limit(top)
+        else:
+            stmt = selects[0] if len(selects) == 1 else union_all(*selects)
+        rows = (await db.execute(stmt)).all()
+        results = {grouping: [] for grouping in groupings}
+        for row in rows:
+            grouping = groupings[row.grouping_id]
+            results[grouping].append(_to_row(
+                row._mapping,
+                "period" if grouping.granularity else None,
+                "key" if grouping.dimension else None,
+                metrics
+            ))
+
+    for grouping, grouped in results.items():
+        # An empty range still yields one all-NULL row for the grand total
+        results[grouping] = sorted(
+            (row for row in grouped if row.count != 0 and not (row.total is None and "total" in metrics)),
+            key=lambda row: (row.period or date.min, _sort_key(row.key))
+        )
+    return results if top is None else _largest(results, top)
+
+
+def _largest(results: dict, top: int) -> dict:
+    """
+    Keeps the `top` rows with the largest totals of each grouping, largest first.
+    """
+    return {
+        grouping: sorted(rows, key=lambda row: row.total, reverse=True)[:top]
+        for grouping, rows in results.items()
+    }
+
+
+def _to_row(mapping, period_name: str | None, key_name: str | None, metrics) -> AggregateRow:
+    """
+    Builds an AggregateRow from a result row.
+    """
+    count = mapping["count"] if "count" in metrics else None
+    return AggregateRow(
+        period=mapping[period_name] if period_name else None,
+        key=mapping[key_name] if key_name else None,
+        total=mapping["total"] if "total" in metrics else None,
+        count=int(count) if count is not None else None,
+        min_amount=mapping["min"] if "min" in metrics else None,
+        max_amount=mapping["max"] if "max" in metrics else None,
+    )
+
+
+def _sort_key(key):
+    """
+    Orders dimension keys with None first.
+    """
+    return (key is not None, key if key is not None else 0)
+
+
+async def aggregate(
+    db: AsyncSession,
+    granularity: str | None = None,
+    dimension: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_ids: list[int] | None = None,
+    metrics: tuple[str, ...] = ("total",),
+    top: int | None = None
+) -> list[AggregateRow]:
+    """
+    Aggregates expenses under one grouping (see aggregate_many).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        granularity (str | None): "day", "week", "month", "quarter", "year" or None.
+        dimension (str | None): "category", "essential" or None.
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        category_ids (list[int] | None): Only include these categories.
+        metrics (tuple[str, ...]): Metrics to compute, from METRICS.
+        top (int | None): Only return this many groups with the largest totals.
+
+    Returns:
+        list[AggregateRow]: Rows ordered by period and key (by total, largest first, with top).
+    """
+    grouping = Grouping(granularity, dimension)
+    results = await aggregate_many(db, [grouping], start_date, end_date, category_ids, metrics, top)
+    return results[grouping]
@@ -0,0 +1,380 @@
+import asyncio
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.models import Category, Expense
+from app.services.data_version import current_version
+
+# Day 0 of the int32 date column
+EPOCH = date(1970, 1, 1)
+
+# Category id stored for expenses without a category
+UNCATEGORIZED = 0
+
+# Rows fetched per chunk while loading the snapshot
+LOAD_CHUNK_SIZE = 100_000
+
+# Dimensions accepted by ColumnarSnapshot.aggregate
+GROUP_BY = ("day", "weekday", "month", "year", "category")
+
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Session.info key holding the expense changes of the current transaction
+_PENDING = "analytics_pending"
+
+
+def to_day(value: date) -> int:
+    """
+    Converts a date to the int32 day number used by the snapshot.
+    """
+    return (value - EPOCH).days
+
+
+def to_cents(amount) -> int:
+    """
+    Converts a money amount to integer cents.
+    """
+    return int(round(amount * 100))
+
+
+def from_cents(cents: int) -> Decimal:
+    """
+    Converts integer cents back to a two-decimal money amount.
+    """
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def from_day(day: int) -> date:
+    """
+    Converts a snapshot day number back to a date.
+    """
+    return EPOCH + timedelta(days=int(day))
+
+
+class ColumnarSnapshot:
+    """
+    In-memory columnar copy of the expenses table for vectorized aggregations.
+
+    Columns are NumPy arrays with spare capacity so that appends from the
+    write paths are amortized O(1): days since 1970 (int32), amounts in
+    cents (int64) and category ids (int32).
+
+    Attributes:
+        size (int): Number of expenses in the snapshot.
+        version (int | None): Data version the snapshot matches (None until loaded).
+        pending_commits (int): Local transactions applied since `version` was read.
+        stale (bool): True when a change could not be applied incrementally.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.days = np.empty(capacity, dtype=np.int32)
+        self.cents = np.empty(capacity, dtype=np.int64)
+        self.categories = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+        self.version = None
+        self.pending_commits = 0
+        self.stale = False
+        self.lock = threading.RLock()
+
+    def _reserve(self, extra: int):
+        """
+        Grows the columns (doubling) so that `extra` more rows fit.
+        """
+        needed = self.size + extra
+        capacity = len(self.days)
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity *= 2
+        for name in ("days", "cents", "categories"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, days, cents, categories):
+        """
+        Appends rows given as equally sized sequences.
+        """
+        days = np.asarray(days, dtype=np.int32)
+        count = len(days)
+        with self.lock:
+            self._reserve(count)
+            end = self.size + count
+            self.days[self.size:end] = days
+            self.cents[self.size:end] = np.asarray(cents, dtype=np.int64)
+            self.categories[self.size:end] = np.asarray(categories, dtype=np.int32)
+            self.size = end
+
+    def replace_with(self, other: "ColumnarSnapshot"):
+        """
+        Swaps in the columns and version of a freshly loaded snapshot.
+        """
+        with self.lock:
+            self.days, self.cents, self.categories = other.days, other.cents, other.categories
+            self.size = other.size
+            self.version = other.version
+            self.pending_commits = 0
+            self.stale = False
+
+    def _mask(self, start_date: date | None, end_date: date | None, category_ids):
+        """
+        Boolean mask of the rows matching the filters.
+        """
+        days = self.days[:self.size]
+        mask = np.ones(self.size, dtype=bool)
+        if start_date is not None:
+            mask &= days >= to_day(start_date)
+        if end_date is not None:
+            mask &= days <= to_day(end_date)
+        if category_ids:
+            mask &= np.isin(self.categories[:self.size], np.asarray(category_ids, dtype=np.int32))
+        return mask
+
+    def aggregate(
+        self,
+        group_by: str | None = None,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        category_ids: list[int] | None = None
+    ) -> list[tuple]:
+        """
+        Sums amounts and counts expenses per group with vectorized NumPy.
+
+        Args:
+            group_by (str | None): One of GROUP_BY, or None for a grand total.
+            start_date (date | None): First day to include.
+            end_date (date | None): Last day to include.
+            category_ids (list[int] | None): Only include these categories.
+
+        Raises:
+            ValueError: For an unknown group_by.
+
+        Returns:
+            list[tuple]: (key, total_cents, count) per group, ordered by key.
+            Keys are day numbers, weekday (0 = Monday), months or years since
+            1970, or category ids.
+        """
+        if group_by is not None and group_by not in GROUP_BY:
+            raise ValueError(f"Unknown group_by: {group_by!r}")
+
+        with self.lock:
+            mask = self._mask(start_date, end_date, category_ids)
+            cents = self.cents[:self.size][mask]
+            if group_by is None:
+                return [(None, int(cents.sum()), int(cents.size))] if cents.size else []
+
+            days = self.days[:self.size][mask]
+            if group_by == "category":
+                keys = self.categories[:self.size][mask]
+            elif group_by == "day":
+                keys = days
+            elif group_by == "weekday":
+                # 1970-01-01 was a Thursday (weekday 3)
+                keys = (days + 3) % 7
+            else:
+                unit = "M" if group_by == "month" else "Y"
+                keys = days.astype("datetime64[D]").astype(f"datetime64[{unit}]").astype(np.int64)
+
+        if not keys.size:
+            return []
+
+        # Keys span a small range (days, months, categories...), so direct
+        # bincounts over the offset keys beat sorting
+        low = int(keys.min())
+        offsets = keys.astype(np.int64) - low
+        counts = np.bincount(offsets)
+        # Sums are exact as long as they stay below 2**53 cents
+        totals = np.rint(np.bincount(offsets, weights=cents)).astype(np.int64)
+        present = np.flatnonzero(counts)
+        return [(int(key) + low, int(totals[key]), int(counts[key])) for key in present]
+
+
+snapshot = ColumnarSnapshot()
+
+# Serializes reloads so concurrent requests share a single load
+_load_lock = asyncio.Lock()
+
+
+def month_label(months_since_epoch: int) -> str:
+    """
+    Formats a month key returned by aggregate(group_by="month") as "YYYY-MM".
+    """
+    year, month = divmod(int(months_since_epoch), 12)
+    return f"{1970 + year:04d}-{month + 1:02d}"
+
+
+def format_key(group_by: str | None, key) -> str | None:
+    """
+    Converts an aggregate key to a readable label.
+    """
+    if group_by == "day":
+        return from_day(key).isoformat()
+    if group_by == "weekday":
+        return WEEKDAYS[key]
+    if group_by == "month":
+        return month_label(key)
+    if group_by == "year":
+        return str(1970 + key)
+    if group_by == "category":
+        return str(key)
+    return None
+
+
+def _rows_to_columns(rows) -> tuple[list, list, list]:
+    """
+    Splits (expense_date, cents, category_id) rows into column lists.
+    """
+    days, cents, categories = [], [], []
+    for expense_date, amount_cents, category_id in rows:
+        days.append(to_day(expense_date))
+        cents.append(amount_cents)
+        categories.append(category_id if category_id is not None else UNCATEGORIZED)
+    return days, cents, categories
+
+
+async def load_snapshot(db: AsyncSession) -> None:
+    """
+    (Re)loads the snapshot from the expenses table.
+
+    Amounts are converted to cents by the database, and rows are streamed
+    in chunks so the load never holds more than one chunk of Python objects.
+    The new columns replace the current ones only once fully loaded.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+    """
+    fresh = ColumnarSnapshot()
+    fresh.version = await db.run_sync(current_version)
+    query = select(
+        Expense.expense_date,
+        # Rounded first: SQLite stores amounts as floats, and the cast truncates
+        cast(func.round(Expense.amount * 100), BigInteger),
+        Expense.category_id
+    ).execution_options(yield_per=LOAD_CHUNK_SIZE)
+
+    result = await db.stream(query)
+    async for rows in result.partitions(LOAD_CHUNK_SIZE):
+        fresh.append(*_rows_to_columns(rows))
+
+    snapshot.replace_with(fresh)
+
+
+def _is_current(version: int) -> bool:
+    """
+    Returns True (and resyncs the version) when the snapshot matches `version`.
+    """
+    with snapshot.lock:
+        if (
+            snapshot.version is not None
+            and not snapshot.stale
+            and version == snapshot.version + snapshot.pending_commits
+        ):
+            snapshot.version = version
+            snapshot.pending_commits = 0
+            return True
+    return False
+
+
+async def get_snapshot(db: AsyncSession) -> ColumnarSnapshot:
+    """
+    Returns the snapshot, loading or reloading it if it is out of date.
+
+    The snapshot is current when the committed data version equals the
+    version it was loaded at plus the local transactions applied to it
+    since. Any other difference (another worker wrote, an update or delete
+    happened) triggers a full reload.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+
+    Returns:
+        ColumnarSnapshot: An up-to-date snapshot.
+    """
+    if _is_current(await db.run_sync(current_version)):
+        return snapshot
+
+    async with _load_lock:
+        # Another request may have reloaded it while this one waited
+        if not _is_current(await db.run_sync(current_version)):
+            await load_snapshot(db)
+    return snapshot
+
+
+def record_batch(db: Session, expenses) -> None:
+    """
+    Queues expenses inserted outside the ORM (bulk loads) for the snapshot.
+
+    They are applied when the transaction commits.
+
+    Args:
+        db (Session): SQLAlchemy database session of the inserting transaction.
+        expenses (Iterable): Objects with amount, expense_date and category_id attributes.
+    """
+    pending = db.info.setdefault(_PENDING, {"rows": [], "stale": False})
+    pending["rows"].extend(
+        (expense.expense_date, to_cents(expense.amount), expense.category_id)
+        for expense in expenses
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session, flush_context):
+    """
+    Remembers the expenses written by this flush until the transaction commits.
+    """
+    touched = False
+    stale = False
+    rows = []
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            rows.append((obj.expense_date, to_cents(obj.amount), obj.category_id))
+            touched = True
+        elif isinstance(obj, Category):
+            touched = True
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Expense):
+            stale = True
+            touched = True
+        elif isinstance(obj, Category):
+            touched = True
+
+    if touched:
+        pending = session.info.setdefault(_PENDING, {"rows": [], "stale": False})
+        pending["rows"].extend(rows)
+        pending["stale"] = pending["stale"] or stale
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session):
+    """
+    Applies a committed transaction's inserts to the loaded snapshot.
+
+    Updates and deletes cannot be applied to the append-only columns, so
+    they mark the snapshot stale instead.
+    """
+    pending = session.info.pop(_PENDING, None)
+    if pending is None or snapshot.version is None:
+        return
+
+    with snapshot.lock:
+        snapshot.pending_commits += 1
+        if pending["stale"]:
+            snapshot.stale = True
+        elif pending["rows"]:
+            snapshot.append(*_rows_to_columns(pending["rows"]))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    """
+    Forgets the changes of a rolled back transaction.
+    """
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.models import Category
+from app.services.data_version import CATEGORIES, current_version
+
+# Seconds a loaded map is trusted before its version is checked again.
+# Local writes invalidate it at once, and unknown ids always trigger a
+# check; this only bounds how long renames made by other processes go unseen.
+REVALIDATE_SECONDS = 30.0
+
+# Session.info flag: the current transaction wrote categories
+_WRITTEN = "categories_written"
+
+
+class CachedCategory(NamedTuple):
+    id: int
+    name: str
+    essential: bool
+
+
+class UnknownCategoryError(LookupError):
+    """
+    Raised when an expense references a category that does not exist.
+    """
+
+
+class CategoryCache:
+    """
+    In-memory copy of the categories table, versioned like the analytics snapshot.
+
+    Attributes:
+        by_id (dict[int, CachedCategory]): Categories by id.
+        names (dict[int, str]): Category names by id.
+        version (int | None): Categories version the map was loaded at (None until loaded).
+        checked_at (float): Monotonic time the version was last checked.
+        writes (int): Local transactions that wrote categories since startup.
+        loaded_writes (int): Value of `writes` when the map was loaded.
+        loads (int): Number of times the map was (re)loaded.
+    """
+
+    def __init__(self):
+        self.by_id = {}
+        self.names = {}
+        self.version = None
+        self.checked_at = 0.0
+        self.writes = 0
+        self.loaded_writes = 0
+        self.loads = 0
+
+    def is_fresh(self, required: Iterable[int] = ()) -> bool:
+        """
+        Returns True when the map can be used without checking the database.
+        """
+        return (
+            self.version is not None
+            and self.writes == self.loaded_writes
+            and time.monotonic() - self.checked_at < REVALIDATE_SECONDS
+            and all(category_id in self.by_id for category_id in required)
+        )
+
+
+cache = CategoryCache()
+
+# Serializes reloads so concurrent requests share a single query
+_load_lock = asyncio.Lock()
+
+
+async def _revalidate(db: AsyncSession) -> None:
+    """
+    Reloads the map if the committed categories version moved (or a local write happened).
+    """
+    writes = cache.writes
+    version = await db.run_sync(current_version, CATEGORIES)
+    if version != cache.version or writes != cache.loaded_writes:
+        rows = (await db.execute(select(Category.id, Category.name, Category.essential))).all()
+        cache.by_id = {row.id: CachedCategory(row.id, row.name, bool(row.essential)) for row in rows}
+        cache.names = {category_id: category.name for category_id, category in cache.by_id.items()}
+        cache.version = version
+        # A write committed during the load leaves the map stale
+        cache.loaded_writes = writes
+        cache.loads += 1
+    cache.checked_at = time.monotonic()
+
+
+async def get_categories(db: AsyncSession, required: Iterable[int] = ()) -> dict[int, CachedCategory]:
+    """
+    Returns every category by id, reloading the map only when it may be out of date.
+
+    The version is checked when the map is older than REVALIDATE_SECONDS,
+    after a local transaction wrote categories, or when one of the
+    `required` ids is missing (it may have been created by another worker).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        required (Iterable[int]): Ids the caller needs.
+
+    Returns:
+        dict[int, CachedCategory]: Categories by id. Must not be mutated.
+    """
+    required = tuple(required)
+    if not cache.is_fresh(required):
+        async with _load_lock:
+            # Another request may have reloaded it while this one waited
+            if not cache.is_fresh(required):
+                await _revalidate(db)
+    return cache.by_id
+
+
+async def get_names(db: AsyncSession, required: Iterable[int] = ()) -> dict[int, str]:
+    """
+    Returns every category name by id (see get_categories).
+    """
+    await get_categories(db, required)
+    return cache.names
+
+
+async def require_category(db: AsyncSession, category_id: int) -> CachedCategory:
+    """
+    Returns a category, checking the database only if it is not cached.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        category_id (int): Category to look up.
+
+    Raises:
+        UnknownCategoryError: If no such category exists.
+
+    Returns:
+        CachedCategory: The category.
+    """
+    categories = await get_categories(db, (category_id,))
+    category = categories.get(category_id)
+    if category is None:
+        raise UnknownCategoryError(f"Category {category_id} does not exist")
+    return category
+
+
+def stats() -> dict:
+    """
+    Returns the size, version and reload count of the map.
+    """
+    return {"entries": len(cache.by_id), "version": cache.version, "loads": cache.loads}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_writes(session, flush_context):
+    """
+    Remembers that the transaction wrote categories.
+    """
+    if any(isinstance(obj, Category) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_WRITTEN] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    """
+    Marks the map stale once a transaction that wrote categories commits.
+    """
+    if session.info.pop(_WRITTEN, False):
+        cache.writes += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session):
+    """
+    Forgets the writes of a rolled back transaction.
+    """
+    session.info.pop(_WRITTEN, None)
@@ -0,0 +1,188 @@
+import asyncio
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+from app.services import metrics
+
+# matplotlib is imported on the first render: it costs hundreds of
+# milliseconds, which would otherwise delay every worker's startup
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Maximum number of charts rendered at the same time
+RENDER_WORKERS = 2
+
+# Maximum total size of the rendered images kept in memory
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Pixels per inch: figure sizes are given in pixels and converted with it
+DPI = 100
+
+# (width, height) in pixels when a request does not choose one (matplotlib's default)
+DEFAULT_SIZE = (640, 480)
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache of rendered images, bounded by total size in bytes.
+
+    Attributes:
+        max_bytes (int): Size budget; least recently used entries are evicted beyond it.
+        size (int): Current total size of the cached values.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that found nothing.
+        evictions (int): Number of entries dropped to respect max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> bytes | None:
+        """
+        Returns the cached bytes for a key and marks it as recently used.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value: bytes) -> None:
+        """
+        Stores bytes under a key, evicting the least recently used entries if needed.
+
+        Values larger than the whole budget are not cached.
+        """
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+
+            self._entries[key] = value
+            self.size += len(value)
+
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+cache = ByteLRUCache(CACHE_MAX_BYTES)
+
+_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="chart-render")
+
+# Renders currently running, so concurrent requests for one chart share the work
+_in_flight: dict[tuple, asyncio.Task] = {}
+
+
+def _render(draw: Callable[["Figure"], None], fmt: str, size: tuple[int, int]) -> bytes:
+    """
+    Draws a chart on a private Figure of `size` pixels and returns the encoded image.
+
+    Uses the object-oriented API only: no pyplot global state is touched,
+    so several charts can be rendered in parallel threads.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    width, height = size
+    figure = Figure(figsize=(width / DPI, height / DPI), dpi=DPI)
+    FigureCanvasAgg(figure)
+    draw(figure)
+
+    buf = io.BytesIO()
+    figure.savefig(buf, format=fmt, dpi=DPI)
+    return buf.getvalue()
+
+
+async def _render_and_cache(key: tuple, draw: Callable[["Figure"], None], fmt: str, size: tuple[int, int]) -> bytes:
+    """
+    Renders a chart on the worker pool and caches the result.
+    """
+    loop = asyncio.get_running_loop()
+    with metrics.phase("render"):
+        image = await loop.run_in_executor(_executor, _render, draw, fmt, size)
+    cache.put(key, image)
+    return image
+
+
+async def render_chart(
+    key: tuple,
+    prepare: Callable[[], Awaitable[Callable[["Figure"], None]]],
+    fmt: str = "png",
+    size: tuple[int, int] = DEFAULT_SIZE
+) -> bytes:
+    """
+    Returns a rendered chart, from the cache when possible.
+
+    The key must identify the chart, its parameters and the data version it
+    was drawn from, so a new version naturally misses the cache. `prepare`
+    is only awaited on a miss: it loads the data and returns the function
+    that draws it. Concurrent misses for the same key share one render.
+
+    Data is always loaded by the calling request (with its own session),
+    and only the CPU-bound render is shared: a request joining a render
+    never depends on another request's session, which is closed if that
+    client disconnects.
+
+    Args:
+        key (tuple): Cache key (chart name, parameters, data version).
+        prepare (Callable): Async function returning a `draw(figure)` callable.
+        fmt (str): Output format ("png" or "svg").
+        size (tuple[int, int]): Width and height in pixels.
+
+    Returns:
+        bytes: Encoded image.
+    """
+    key = (*key, fmt, *size)
+
+    image = cache.get(key)
+    if image is not None:
+        return image
+
+    task = _in_flight.get(key)
+    if task is None:
+        draw = await prepare()
+        # Another request may have started the same render while this one loaded
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(_render_and_cache(key, draw, fmt, size))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    # Shielded so a client disconnect does not cancel a render others wait on
+    return await asyncio.shield(task)
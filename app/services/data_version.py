@@ -0,0 +1,91 @@
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.database.models import Category, DataVersion, Expense
+from app.services.read_routing import record_committed_write
+
+# Counter covering expenses, categories and everything derived from them
+DATA = "data"
+
+# Counter covering the categories table only (see category_cache)
+CATEGORIES = "categories"
+
+versions = DataVersion.__table__
+
+# Session.info flag: the current transaction already bumped the counter
+_BUMPED = "data_version_bumped"
+
+
+def bump(db: Session, name: str = DATA) -> None:
+    """
+    Increments a data-version counter inside the current transaction.
+
+    The counter is bumped at most once per transaction, and the new value
+    only becomes visible to other sessions when the transaction commits.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        name (str): Counter to increment.
+    """
+    bumped = db.info.setdefault(_BUMPED, set())
+    if name in bumped:
+        return
+
+    conn = db.connection()
+    result = conn.execute(
+        update(versions)
+        .where(versions.c.name == name)
+        .values(version=versions.c.version + 1)
+    )
+    if result.rowcount == 0:
+        conn.execute(insert(versions).values(name=name, version=1))
+
+    bumped.add(name)
+
+
+def current_version(db: Session, name: str = DATA) -> int:
+    """
+    Returns the committed value of a data-version counter.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        name (str): Counter to read.
+
+    Returns:
+        int: Current version (0 if nothing was ever written).
+    """
+    version = db.execute(
+        select(versions.c.version).where(versions.c.name == name)
+    ).scalar()
+    return version or 0
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_write(session, flush_context):
+    """
+    Bumps the data version when a flush writes expenses or categories,
+    and the categories version when it writes categories.
+    """
+    written = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, (Expense, Category)) for obj in written):
+        bump(session)
+    if any(isinstance(obj, Category) for obj in written):
+        bump(session, CATEGORIES)
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session):
+    """
+    Tells read-your-writes routing that data changed, and allows the next
+    transaction to bump the counter again.
+    """
+    if session.info.pop(_BUMPED, None):
+        record_committed_write()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_bump(session):
+    """
+    Allows the next transaction to bump the counter again.
+    """
+    session.info.pop(_BUMPED, None)
@@ -0,0 +1,317 @@
+import math
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.engine import Connection
+
+from app.database.models import Expense, ExpenseAmountBucket
+
+# Quantiles are estimated within this relative error (DDSketch guarantee)
+RELATIVE_ACCURACY = 0.01
+
+# Consecutive bucket bounds grow by this factor
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+# Bucket of zero (and negative) amounts, below every logarithmic bucket
+ZERO_BUCKET = -(2 ** 31)
+
+# Rows inserted per statement when rebuilding
+REBUILD_BATCH_SIZE = 10_000
+
+buckets = ExpenseAmountBucket.__table__
+expenses = Expense.__table__
+
+
+def bucket_index(amount) -> int:
+    """
+    Returns the logarithmic bucket an amount is counted in.
+
+    Bucket i holds the amounts in (GAMMA^(i-1), GAMMA^i], so any amount in
+    it is within RELATIVE_ACCURACY of the bucket's representative value.
+    """
+    value = float(amount)
+    if value <= 0:
+        return ZERO_BUCKET
+    return math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    """
+    Returns the representative amount of a bucket (0 for the zero bucket).
+    """
+    if index == ZERO_BUCKET:
+        return 0.0
+    return 2 * GAMMA ** index / (GAMMA + 1)
+
+
+def bucket_upper_bound(index: int) -> float:
+    """
+    Returns the largest amount counted in a bucket.
+    """
+    if index == ZERO_BUCKET:
+        return 0.0
+    return GAMMA ** index
+
+
+class AmountSketch:
+    """
+    Mergeable quantile sketch of expense amounts (logarithmic buckets, DDSketch style).
+
+    Sketches of different months and categories merge by adding the counts
+    of equal buckets, so any range is answered exactly as if its amounts had
+    been sketched together.
+
+    Attributes:
+        counts (Counter[int, int]): Number of amounts per bucket index.
+    """
+
+    def __init__(self, counts: dict[int, int] | None = None):
+        self.counts = Counter(counts or {})
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, amount, count: int = 1) -> None:
+        self.counts[bucket_index(amount)] += count
+
+    def merge(self, other: "AmountSketch") -> None:
+        self.counts.update(other.counts)
+
+    def quantiles(self, qs: list[float]) -> list[float | None]:
+        """
+        Estimates several quantiles in one pass over the buckets.
+
+        Follows percentile_cont: the quantile at rank q * (count - 1) is
+        interpolated between the two amounts around it. Both are estimated
+        within RELATIVE_ACCURACY, so the interpolation is as well.
+
+        Args:
+            qs (list[float]): Quantiles between 0 and 1, in increasing order.
+
+        Returns:
+            list[float | None]: One estimate per quantile, None if the sketch is empty.
+        """
+        total = self.count
+        if not total:
+            return [None] * len(qs)
+
+        # Ranks of the amounts each quantile interpolates between, in increasing order
+        positions = [q * (total - 1) for q in qs]
+        ranks = sorted({rank for position in positions for rank in (math.floor(position), math.ceil(position))})
+
+        values = {}
+        pending = iter(ranks)
+        rank = next(pending)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while rank is not None and seen > rank:
+                values[rank] = bucket_value(index)
+                rank = next(pending, None)
+            if rank is None:
+                break
+
+        estimates = []
+        for position in positions:
+            lower, upper = values[math.floor(position)], values[math.ceil(position)]
+            estimates.append(lower + (position - math.floor(position)) * (upper - lower))
+        return estimates
+
+    def histogram(self, bins: int) -> list[tuple[float, float, int]]:
+        """
+        Groups the buckets into at most `bins` logarithmically spaced bins.
+
+        Bin edges fall on bucket bounds, so the counts are exact.
+
+        Returns:
+            list[tuple[float, float, int]]: (lower, upper, count) per bin, in amount
+            order; a (0, 0, count) bin comes first when zero amounts exist.
+        """
+        result = []
+        if self.counts.get(ZERO_BUCKET):
+            result.append((0.0, 0.0, self.counts[ZERO_BUCKET]))
+
+        indexes = sorted(index for index, count in self.counts.items() if index != ZERO_BUCKET and count)
+        if not indexes:
+            return result
+
+        first, span = indexes[0], indexes[-1] - indexes[0] + 1
+        bins = min(bins, span)
+        edges = [first + round(k * span / bins) for k in range(bins + 1)]
+        for lower_index, upper_index in zip(edges, edges[1:]):
+            count = sum(self.counts.get(index, 0) for index in range(lower_index, upper_index))
+            result.append((bucket_upper_bound(lower_index - 1), bucket_upper_bound(upper_index - 1), count))
+        return result
+
+
+def to_money(value: float | None) -> Decimal | None:
+    """
+    Rounds an estimated amount to cents.
+    """
+    return None if value is None else Decimal(f"{value:.2f}")
+
+
+def _upsert_statement(dialect_name: str):
+    """
+    Builds an INSERT that adds to an existing bucket count instead of failing.
+
+    Returns None for dialects without a native upsert.
+    """
+    if dialect_name in ("postgresql", "sqlite"):
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(buckets)
+        return stmt.on_conflict_do_update(
+            index_elements=[buckets.c.month, buckets.c.category_id, buckets.c.bucket],
+            set_={"count": buckets.c.count + stmt.excluded["count"]}
+        )
+
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+
+        stmt = dialect_insert(buckets)
+        return stmt.on_duplicate_key_update(count=buckets.c.count + stmt.inserted["count"])
+
+    return None
+
+
+def add_counts(conn: Connection, counts: Counter) -> None:
+    """
+    Adds bucket counts of newly inserted expenses.
+
+    Args:
+        conn (Connection): Connection of the transaction that inserted the expenses.
+        counts (Counter): Number of new expenses per (month, category_id, bucket).
+    """
+    if not counts:
+        return
+
+    rows = [
+        {"month": month, "category_id": category_id, "bucket": bucket, "count": count}
+        for (month, category_id, bucket), count in counts.items()
+    ]
+    stmt = _upsert_statement(conn.dialect.name)
+    if stmt is not None:
+        conn.execute(stmt, rows)
+        return
+
+    # Fallback for dialects without upsert: update, then insert missing rows
+    for row in rows:
+        result = conn.execute(
+            update(buckets)
+            .where(
+                buckets.c.month == row["month"],
+                buckets.c.category_id == row["category_id"],
+                buckets.c.bucket == row["bucket"]
+            )
+            .values(count=buckets.c.count + row["count"])
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(buckets).values(**row))
+
+
+def replace_counts(conn: Connection, month: date, category_id: int, amounts) -> None:
+    """
+    Replaces the sketch of one (month, category) pair with one built from its amounts.
+
+    Args:
+        conn (Connection): Connection of the transaction that changed the expenses.
+        month (date): First day of the month.
+        category_id (int): Category (0 for uncategorized).
+        amounts (Iterable): Every amount of that month and category.
+    """
+    conn.execute(
+        delete(buckets).where(buckets.c.month == month, buckets.c.category_id == category_id)
+    )
+    counts = Counter((month, category_id, bucket_index(amount)) for amount in amounts)
+    if counts:
+        add_counts(conn, counts)
+
+
+def rebuild(conn: Connection, month_key, category_key) -> int:
+    """
+    Rebuilds every sketch from the expenses table.
+
+    Args:
+        conn (Connection): Connection of the rebuilding transaction.
+        month_key (ColumnElement): Month expression of an expense (see rollups.month_start_sql).
+        category_key (ColumnElement): Category expression of an expense (0 for uncategorized).
+
+    Returns:
+        int: Number of bucket rows written.
+    """
+    conn.execute(delete(buckets))
+
+    counts = Counter()
+    result = conn.execution_options(stream_results=True).execute(
+        select(month_key, category_key, expenses.c.amount)
+    )
+    for partition in result.partitions(REBUILD_BATCH_SIZE):
+        counts.update((month, category_id, bucket_index(amount)) for month, category_id, amount in partition)
+
+    rows = [
+        {"month": month, "category_id": category_id, "bucket": bucket, "count": count}
+        for (month, category_id, bucket), count in counts.items()
+    ]
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        conn.execute(insert(buckets), rows[start:start + REBUILD_BATCH_SIZE])
+    return len(rows)
+
+
+def sketch_query(group_by: str, start_month: date | None, end_month: date | None, category_ids: list[int] | None):
+    """
+    Builds the query reading merged bucket counts per group.
+
+    Args:
+        group_by (str): "category", "month" or "total".
+        start_month (date | None): First month to include.
+        end_month (date | None): Last month to include.
+        category_ids (list[int] | None): Only include these categories.
+
+    Returns:
+        Select: Rows of (key, bucket, count), key being None for "total".
+    """
+    if group_by == "category":
+        key = buckets.c.category_id
+    elif group_by == "month":
+        key = buckets.c.month
+    else:
+        key = None
+
+    columns = [key.label("key")] if key is not None else []
+    query = select(*columns, buckets.c.bucket, func.sum(buckets.c.count).label("count"))
+
+    if start_month:
+        query = query.where(buckets.c.month >= start_month)
+    if end_month:
+        query = query.where(buckets.c.month <= end_month)
+    if category_ids:
+        query = query.where(buckets.c.category_id.in_(category_ids))
+
+    if key is not None:
+        return query.group_by(key, buckets.c.bucket).order_by(key)
+    return query.group_by(buckets.c.bucket)
+
+
+def merge_rows(rows, has_key: bool = True) -> dict:
+    """
+    Builds one merged sketch per group from sketch_query rows.
+
+    Returns:
+        dict: Sketch per group key, in row order (key None for "total").
+    """
+    sketches = {}
+    for row in rows:
+        key = row.key if has_key else None
+        sketch = sketches.get(key)
+        if sketch is None:
+            sketch = sketches[key] = AmountSketch()
+        sketch.counts[row.bucket] += int(row.count)
+    return sketches
@@ -0,0 +1,49 @@
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Picks the points of a series to keep with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every other bucket of
+    roughly len(x) / threshold points contributes the point forming the
+    largest triangle with the previously kept point and the average of the
+    next bucket. Peaks and troughs survive, unlike with plain averaging,
+    and the cost is linear in the number of points.
+
+    Args:
+        x (np.ndarray): Increasing x values (e.g. day numbers).
+        y (np.ndarray): Values, same length as x.
+        threshold (int): Number of points to keep (e.g. the plot width in pixels).
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points (all of them when the
+        series is already short enough).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bucket boundaries over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        # Twice the triangle areas; the constant factor does not change the argmax
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
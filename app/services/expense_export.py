@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from sqlalchemy import Select
+
+from app.database.connection import AsyncSessionLocal
+
+# Rows fetched from the server-side cursor (and written) per chunk
+CHUNK_SIZE = 10_000
+
+# Columns written to every export format, in order
+EXPORT_COLUMNS = ("id", "amount", "description", "expense_date", "category_id", "category_name")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportFormatUnavailable(RuntimeError):
+    """
+    Raised when an export format needs an optional dependency that is not installed.
+    """
+
+
+async def iter_row_chunks(query: Select, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[list]:
+    """
+    Streams query results from a server-side cursor in fixed-size chunks.
+
+    A dedicated session is opened because the response body is produced
+    after the endpoint (and its request-scoped session) has returned.
+
+    Args:
+        query (Select): Query to stream.
+        chunk_size (int): Rows per chunk.
+
+    Yields:
+        list[Row]: Up to chunk_size rows.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions(chunk_size):
+            yield partition
+
+
+async def iter_csv(chunks: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """
+    Encodes row chunks as CSV with a header line.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buf.getvalue().encode()
+
+    async for rows in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+
+
+def _json_default(value):
+    """
+    Encodes Decimal amounts as strings (lossless) and dates in ISO format.
+    """
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+async def iter_ndjson(chunks: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """
+    Encodes row chunks as newline-delimited JSON objects.
+    """
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+            for row in rows
+        ).encode()
+
+
+class _StreamSink(io.RawIOBase):
+    """
+    Write-only file that hands written bytes back to the response stream.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_schema():
+    """
+    Returns the Arrow schema of a Parquet export.
+
+    Raises:
+        ExportFormatUnavailable: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ExportFormatUnavailable("Parquet export requires the 'pyarrow' package") from exc
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("amount", pa.decimal128(10, 2)),
+        ("description", pa.string()),
+        ("expense_date", pa.date32()),
+        ("category_id", pa.int32()),
+        ("category_name", pa.string()),
+    ])
+
+
+async def iter_parquet(chunks: AsyncIterator[list]) -> AsyncIterator[bytes]:
+    """
+    Encodes row chunks as a Parquet file, one row group per chunk.
+
+    Each row group is sent as soon as it is written; only the footer waits
+    for the last chunk.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    async for rows in chunks:
+        columns = list(zip(*rows))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        ))
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "parquet": iter_parquet,
+}
+
+
+def export_stream(query: Select, export_format: str) -> AsyncIterator[bytes]:
+    """
+    Returns the byte stream of an export in the requested format.
+
+    Args:
+        query (Select): Query selecting EXPORT_COLUMNS.
+        export_format (str): "csv", "ndjson" or "parquet".
+
+    Raises:
+        ExportFormatUnavailable: If the format's optional dependency is missing.
+
+    Returns:
+        AsyncIterator[bytes]: Encoded chunks, produced as rows are fetched.
+    """
+    if export_format == "parquet":
+        parquet_schema()
+
+    return ENCODERS[export_format](iter_row_chunks(query))
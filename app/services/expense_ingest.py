@@ -0,0 +1,458 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database.models import Expense
+from app.schemas.expenses import ExpenseCreate
+from app.services import analytics_engine, category_cache
+from app.services.category_cache import UnknownCategoryError
+from app.services.data_version import bump
+from app.services.rollups import add_expenses
+
+# Number of validated rows written per INSERT / COPY statement
+BATCH_SIZE = 5000
+
+# Maximum number of row errors returned to the client
+MAX_REPORTED_ERRORS = 1000
+
+# Columns filled by a bulk upload, in COPY order
+EXPENSE_COLUMNS = ("amount", "description", "expense_date", "category_id")
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class BulkUploadError(ValueError):
+    """
+    Raised when the request body as a whole cannot be parsed (e.g. not a JSON array).
+    """
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Splits a streamed request body into text lines without buffering the whole body.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw body chunks (e.g. request.stream()).
+
+    Raises:
+        BulkUploadError: If a line is not valid UTF-8.
+
+    Yields:
+        str: Each line, without its trailing newline.
+    """
+    pending = b""
+    line_number = 0
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield _decode_line(line, line_number)
+    if pending:
+        yield _decode_line(pending, line_number + 1)
+
+
+def _decode_line(line: bytes, line_number: int) -> str:
+    """
+    Decodes one body line as UTF-8 (without its trailing carriage return).
+    """
+    try:
+        return line.rstrip(b"\r").decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise BulkUploadError(f"Line {line_number} is not valid UTF-8: {exc.reason}") from exc
+
+
+async def iter_json_records(body: bytes) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yields the items of a JSON array body.
+
+    Args:
+        body (bytes): Full request body.
+
+    Raises:
+        BulkUploadError: If the body is not a JSON array.
+
+    Yields:
+        tuple[int, object]: Row number and decoded item.
+    """
+    try:
+        items = json.loads(body)
+    except ValueError as exc:
+        raise BulkUploadError(f"Invalid JSON body: {exc}") from exc
+
+    if not isinstance(items, list):
+        raise BulkUploadError("JSON body must be an array of expenses")
+
+    for row, item in enumerate(items, start=1):
+        yield row, item
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yields one record per non-empty line of a newline-delimited JSON stream.
+
+    Lines that are not valid JSON are yielded as the exception so that they
+    are reported as row errors instead of aborting the whole upload.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw body chunks.
+
+    Yields:
+        tuple[int, object]: Row number and decoded record (or the decoding error).
+    """
+    row = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError as exc:
+            yield row, exc
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, object]]:
+    """
+    Yields one record per data row of a streamed CSV body.
+
+    The first line must be a header naming the expense fields. Quoted fields
+    spanning several lines are supported by joining lines until quotes balance.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Raw body chunks.
+
+    Yields:
+        tuple[int, object]: Row number and the row as a dict keyed by header.
+    """
+    header = None
+    row = 0
+    record = ""
+
+    async for line in iter_lines(chunks):
+        record = f"{record}\n{line}" if record else line
+
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+
+        # Empty cells are treated as missing values (e.g. no description)
+        yield row, {key: value for key, value in zip(header, values) if value != ""}
+
+    if record:
+        row += 1
+        yield row, ValueError("Unterminated quoted field")
+
+
+def validate_record(record: object) -> ExpenseCreate:
+    """
+    Validates a decoded record against the ExpenseCreate schema.
+
+    Args:
+        record (object): Decoded row (dict) or the error raised while decoding it.
+
+    Raises:
+        ValueError: If the record cannot be turned into an ExpenseCreate.
+
+    Returns:
+        ExpenseCreate: The validated expense.
+    """
+    if isinstance(record, Exception):
+        raise ValueError(str(record))
+    if not isinstance(record, dict):
+        raise ValueError("Row must be an object")
+
+    try:
+        return ExpenseCreate(**record)
+    except ValidationError as exc:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+                for err in exc.errors()
+            )
+        ) from exc
+
+
+async def check_category(db: AsyncSession, category_id: int, missing: set[int]) -> None:
+    """
+    Rejects a row whose category does not exist, using the category cache.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        category_id (int): Category of the row.
+        missing (set[int]): Ids already found missing during this upload
+            (updated), so repeated bad ids do not query the database again.
+
+    Raises:
+        ValueError: If the category does not exist.
+    """
+    if category_id not in missing:
+        try:
+            await category_cache.require_category(db, category_id)
+            return
+        except UnknownCategoryError:
+            missing.add(category_id)
+    raise ValueError(f"category_id: Category {category_id} does not exist")
+
+
+def _copy_value(value) -> str:
+    """
+    Encodes a single value for PostgreSQL COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _copy_batch(db: Session, rows: list[tuple]):
+    """
+    Writes a batch with COPY FROM STDIN (PostgreSQL + psycopg2 only).
+    """
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(value) for value in row))
+        buf.write("\n")
+    buf.seek(0)
+
+    raw_connection = db.connection().connection
+    cursor = raw_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Expense.__tablename__} ({', '.join(EXPENSE_COLUMNS)}) FROM STDIN",
+            buf
+        )
+    finally:
+        cursor.close()
+
+
+async def _copy_batch_async(db: AsyncSession, rows: list[tuple]):
+    """
+    Writes a batch with asyncpg's binary COPY (PostgreSQL + asyncpg only).
+    """
+    conn = await db.connection()
+    raw_connection = await conn.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        Expense.__tablename__,
+        records=rows,
+        columns=list(EXPENSE_COLUMNS)
+    )
+
+
+def supports_copy(db: Session | AsyncSession) -> bool:
+    """
+    Returns True when the session is bound to PostgreSQL through psycopg2 or asyncpg.
+    """
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver in ("psycopg2", "asyncpg")
+
+
+def _record_batch(db: Session, expenses: list[ExpenseCreate]):
+    """
+    Folds a written batch into the rollups and the analytics snapshot, and
+    bumps the data version.
+
+    Core inserts bypass the ORM flush hooks, so this is done explicitly.
+    """
+    add_expenses(db.connection(), expenses)
+    analytics_engine.record_batch(db, expenses)
+    bump(db)
+
+
+def _as_rows(expenses: list[ExpenseCreate]) -> list[tuple]:
+    """
+    Converts validated expenses to tuples in EXPENSE_COLUMNS order.
+    """
+    return [tuple(getattr(expense, column) for column in EXPENSE_COLUMNS) for expense in expenses]
+
+
+def _insert_values(rows: list[tuple]) -> list[dict]:
+    """
+    Converts row tuples to parameter sets for a multi-row INSERT.
+    """
+    return [dict(zip(EXPENSE_COLUMNS, row)) for row in rows]
+
+
+def write_rows(db: Session, rows: list[tuple]):
+    """
+    Writes raw expense rows in a single statement, without any bookkeeping.
+
+    Uses COPY on PostgreSQL and a multi-row INSERT elsewhere. Rollups, the
+    analytics snapshot and the data version are left untouched, so callers
+    loading large datasets must run rebuild_rollups once they are done.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        rows (list[tuple]): (amount, description, expense_date, category_id) tuples.
+    """
+    if supports_copy(db):
+        _copy_batch(db, rows)
+    else:
+        db.execute(insert(Expense), _insert_values(rows))
+
+
+def insert_batch(db: Session, expenses: list[ExpenseCreate]):
+    """
+    Writes a batch of validated expenses in a single statement (sync path for scripts).
+
+    Uses COPY on PostgreSQL and a multi-row INSERT elsewhere, then folds the
+    batch into the rollup table. The caller is responsible for committing or
+    rolling back the transaction.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        expenses (list[ExpenseCreate]): Validated expenses to write.
+    """
+    if not expenses:
+        return
+
+    write_rows(db, _as_rows(expenses))
+    _record_batch(db, expenses)
+
+
+async def insert_batch_async(db: AsyncSession, expenses: list[ExpenseCreate]):
+    """
+    Writes a batch of validated expenses in a single statement (async path for the API).
+
+    Same behaviour as insert_batch, with COPY going through asyncpg.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        expenses (list[ExpenseCreate]): Validated expenses to write.
+    """
+    if not expenses:
+        return
+
+    rows = _as_rows(expenses)
+    if supports_copy(db):
+        await _copy_batch_async(db, rows)
+    else:
+        await db.execute(insert(Expense), _insert_values(rows))
+
+    await db.run_sync(_record_batch, expenses)
+
+
+async def ingest_expenses(
+    db: AsyncSession,
+    records: AsyncIterator[tuple[int, object]],
+    mode: str = "atomic",
+    batch_size: int = BATCH_SIZE
+) -> dict:
+    """
+    Validates streamed records and writes them in batches.
+
+    In "atomic" mode a single invalid row aborts the upload: nothing is
+    written, but the remaining rows are still validated so every error is
+    reported. In "skip" mode invalid rows are reported and ignored. Rows
+    referencing an unknown category are invalid too (checked against the
+    category cache rather than left to the foreign key).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        records (AsyncIterator[tuple[int, object]]): Row number / record pairs.
+        mode (str): "atomic" or "skip".
+        batch_size (int): Rows written per statement.
+
+    Returns:
+        dict: Summary matching the BulkExpenseResult schema.
+    """
+    received = 0
+    inserted = 0
+    failed = 0
+    errors = []
+    batch = []
+    missing_categories = set()
+
+    try:
+        async for row, record in records:
+            received += 1
+            try:
+                expense = validate_record(record)
+                await check_category(db, expense.category_id, missing_categories)
+            except ValueError as exc:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row, "error": str(exc)})
+                continue
+
+            # Once an atomic upload has failed there is no point writing more rows
+            if mode == "atomic" and failed:
+                continue
+
+            batch.append(expense)
+            if len(batch) >= batch_size:
+                await insert_batch_async(db, batch)
+                inserted += len(batch)
+                batch = []
+
+        if mode == "atomic" and failed:
+            await db.rollback()
+            inserted = 0
+        else:
+            await insert_batch_async(db, batch)
+            inserted += len(batch)
+            await db.commit()
+
+    except Exception:
+        await db.rollback()
+        raise
+
+    return {
+        "mode": mode,
+        "received": received,
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors
+    }
+
+
+async def record_stream(content_type: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, object]]:
+    """
+    Picks the body parser matching the request Content-Type.
+
+    CSV and NDJSON bodies are parsed as they stream in; anything else is
+    read fully and parsed as a JSON array.
+
+    Args:
+        content_type (str): Value of the Content-Type header.
+        chunks (AsyncIterator[bytes]): Raw body chunks.
+
+    Yields:
+        tuple[int, object]: Row number and decoded record.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+
+    if media_type in CSV_CONTENT_TYPES:
+        records = iter_csv_records(chunks)
+    elif media_type in NDJSON_CONTENT_TYPES:
+        records = iter_ndjson_records(chunks)
+    else:
+        records = iter_json_records(b"".join([chunk async for chunk in chunks]))
+
+    async for row, record in records:
+        yield row, record
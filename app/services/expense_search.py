@@ -0,0 +1,71 @@
+from sqlalchemy import and_
+
+from app.database.models import Expense
+
+# Longest search string accepted, and most keywords combined in one search
+MAX_QUERY_LENGTH = 100
+MAX_TERMS = 5
+
+# Escape character used in the generated LIKE patterns
+LIKE_ESCAPE = "\\"
+
+
+class InvalidSearchError(ValueError):
+    """
+    Raised when a search string has no usable keyword.
+    """
+
+
+def escape_like(term: str) -> str:
+    """
+    Escapes LIKE wildcards so a keyword only matches itself.
+    """
+    return (
+        term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def search_terms(q: str) -> list[str]:
+    """
+    Splits a search string into distinct, lowercase keywords.
+
+    Args:
+        q (str): Search string, e.g. "taxi airport".
+
+    Raises:
+        InvalidSearchError: If it has no keywords or more than MAX_TERMS.
+
+    Returns:
+        list[str]: Keywords in their original order.
+    """
+    terms = list(dict.fromkeys(q.lower().split()))
+    if not terms:
+        raise InvalidSearchError("The search string has no keywords")
+    if len(terms) > MAX_TERMS:
+        raise InvalidSearchError(f"At most {MAX_TERMS} keywords can be combined")
+    return terms
+
+
+def description_matches(q: str):
+    """
+    Builds the condition matching expenses whose description contains every keyword.
+
+    Each keyword is a case-insensitive substring match (ILIKE '%term%').
+    On PostgreSQL it is answered by the pg_trgm GIN index on description,
+    so it does not scan the table; elsewhere it is a plain LIKE filter.
+
+    Args:
+        q (str): Search string.
+
+    Raises:
+        InvalidSearchError: If the search string is not usable.
+
+    Returns:
+        ColumnElement: Condition to add to an expenses query.
+    """
+    return and_(*(
+        Expense.description.ilike(f"%{escape_like(term)}%", escape=LIKE_ESCAPE)
+        for term in search_terms(q)
+    ))
@@ -1,67 +1,116 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from datetime import date
+from typing import NamedTuple
 
-from app.database.models import Expense, Category
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services import aggregation, category_cache
+from app.services.aggregation import Grouping
 
-def get_monthly_totals(db: Session):
-    """
-    Returns total expenses grouped by year and month.
+# Category names treated as rent
+RENT_NAMES = ("rent", "arriendo")
 
-    Args:
-        db (Session): SQLAlchemy database session
+# Groupings computed together for the insights
+BY_MONTH = Grouping(granularity="month")
+BY_CATEGORY = Grouping(dimension="category")
+GRAND_TOTAL = Grouping()
 
-    Returns:
-        list: List of rows with 'year', 'month', and 'total' fields
+
+class MonthTotal(NamedTuple):
+    year: int
+    month: int
+    total: object
+
+
+class CategoryTotal(NamedTuple):
+    name: str
+    total: object
+
+
+class InsightTotals(NamedTuple):
     """
-    return (
-        db.query(
-            extract("year", Expense.expense_date).label("year"),
-            extract("month", Expense.expense_date).label("month"),
-            func.sum(Expense.amount).label("total")
-        )
-        .group_by("year", "month")
-        .order_by("year", "month")
-        .all()
-    )
+    Everything generate_insights needs, computed in a single query.
+
+    Attributes:
+        monthly (list[MonthTotal]): Total per month, in chronological order.
+        categories (list[CategoryTotal]): Total per category, largest first.
+        total (Decimal): Grand total over the range.
+    """
+    monthly: list[MonthTotal]
+    categories: list[CategoryTotal]
+    total: object
 
 
-def get_category_totals(db: Session):
+async def get_insight_totals(
+    db: AsyncSession,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None
+) -> InsightTotals:
     """
-    Returns total expenses grouped by category.
+    Returns monthly totals, category totals and the grand total in one round trip.
+
+    The three groupings are computed by a single aggregation statement
+    (GROUPING SETS on PostgreSQL, UNION ALL elsewhere); see
+    aggregation.aggregate_many for how the source table is chosen.
 
     Args:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        category_id (int | None): Restrict the insights to one category.
 
     Returns:
-        list: List of rows with 'name' (category) and 'total' fields
+        InsightTotals: Monthly, per-category and overall totals.
     """
-    return (
-        db.query(
-            Category.name,
-            func.sum(Expense.amount).label("total")
-        )
-        .join(Expense)
-        .group_by(Category.name)
-        .order_by(func.sum(Expense.amount).desc())
-        .all()
+    results = await aggregation.aggregate_many(
+        db,
+        [BY_MONTH, BY_CATEGORY, GRAND_TOTAL],
+        start_date,
+        end_date,
+        [category_id] if category_id is not None else None
     )
 
+    monthly = [
+        MonthTotal(row.period.year, row.period.month, row.total)
+        for row in results[BY_MONTH]
+    ]
+
+    # Uncategorized expenses count towards months and the total, not categories
+    names = await category_cache.get_names(db)
+    categories = sorted(
+        (
+            CategoryTotal(names[row.key], row.total)
+            for row in results[BY_CATEGORY] if row.key in names
+        ),
+        key=lambda c: c.total,
+        reverse=True
+    )
+    grand_total = next((row.total for row in results[GRAND_TOTAL]), None)
+
+    return InsightTotals(monthly, categories, grand_total or 0)
 
-def generate_insights(db: Session) -> list[str]:
+
+async def generate_insights(
+    db: AsyncSession,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    category_id: int | None = None
+) -> list[str]:
     """
     Generates textual insights based on the user's expenses.
 
     Args:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
+        start_date (date | None): First day to include.
+        end_date (date | None): Last day to include.
+        category_id (int | None): Restrict the insights to one category.
 
     Returns:
         list[str]: List of insight strings
     """
     insights = []
 
-    monthly = get_monthly_totals(db)
-    categories = get_category_totals(db)
+    monthly, categories, total_spent = await get_insight_totals(db, start_date, end_date, category_id)
 
     if not monthly or not categories:
         return ["Not enough data to generate insights."]
@@ -88,10 +137,8 @@ def generate_insights(db: Session) -> list[str]:
     )
 
     # 💸 Rent weight (if present)
-    total_spent = sum(m.total for m in monthly)
-
     for name, total in categories:
-        if name.lower() in ("rent", "arriendo"):
+        if name.lower() in RENT_NAMES:
             percent = (total / total_spent) * 100
             insights.append(
                 f"🏠 Rent represents {percent:.1f}% of all your expenses."
@@ -0,0 +1,62 @@
+from decimal import Decimal
+from typing import Iterable, Sequence
+
+import orjson
+from fastapi.responses import Response
+
+from app.services import metrics
+
+
+def encode_money(value: Decimal) -> str:
+    """
+    Encodes a money amount as a string with exactly two decimals.
+
+    Strings keep amounts exact (no float rounding) and every endpoint
+    renders the same amount the same way ("12.50", never "12.5").
+    """
+    return format(value, ".2f")
+
+
+def _default(value):
+    """
+    orjson fallback for types it does not encode natively.
+    """
+    if isinstance(value, Decimal):
+        return encode_money(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    """
+    Encodes content to JSON bytes with orjson (dates as ISO strings, Decimals as money).
+    """
+    return orjson.dumps(content, default=_default)
+
+
+def rows_to_objects(columns: Sequence[str], rows: Iterable) -> list[dict]:
+    """
+    Pairs row tuples with column names, ready for dumps().
+
+    Args:
+        columns (Sequence[str]): Field names, in row order.
+        rows (Iterable): SQLAlchemy rows or plain tuples.
+
+    Returns:
+        list[dict]: One object per row.
+    """
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded with orjson, skipping per-row Pydantic validation.
+
+    Endpoints returning it keep their `response_model` for the OpenAPI
+    schema; FastAPI does not re-validate a returned Response.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        with metrics.phase("serialize"):
+            return dumps(content)
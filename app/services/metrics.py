@@ -0,0 +1,239 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# Upper bounds of the histogram buckets (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Route label of requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """
+    Work done on behalf of the current request.
+
+    Attributes:
+        scope (dict): ASGI scope of the request.
+        queries (int): DBAPI cursor executions.
+        db_seconds (float): Time spent in those executions.
+        phases (dict[str, float]): Seconds spent in named phases (e.g. "render", "serialize").
+    """
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+
+    @property
+    def route(self) -> str:
+        """
+        Path template of the matched route (known once routing is done).
+        """
+        return getattr(self.scope.get("route"), "path", UNMATCHED_ROUTE)
+
+
+# Stats of the request being handled; None outside requests (e.g. scripts)
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels, rendered in Prometheus text format.
+    """
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...], buckets: tuple):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # One counter per bucket plus +Inf, then the sum
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(self._series.items())
+            for label_values, (counts, total) in series:
+                labels = ",".join(
+                    f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)
+                )
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{labels}}} {total}")
+                lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes a label value for the Prometheus text format.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+request_duration = Histogram(
+    "spendmind_http_request_duration_seconds",
+    "Time from request start to the end of the response body.",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS
+)
+request_queries = Histogram(
+    "spendmind_http_request_db_queries",
+    "SQL statements executed per request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS
+)
+request_db_duration = Histogram(
+    "spendmind_http_request_db_seconds",
+    "Time spent executing SQL per request.",
+    ("method", "route"),
+    LATENCY_BUCKETS
+)
+response_size = Histogram(
+    "spendmind_http_response_size_bytes",
+    "Response body size.",
+    ("method", "route"),
+    SIZE_BUCKETS
+)
+
+HISTOGRAMS = (request_duration, request_queries, request_db_duration, response_size)
+
+
+def render_metrics() -> str:
+    """
+    Renders every metric in Prometheus text exposition format.
+    """
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+def current_request() -> RequestStats | None:
+    """
+    Returns the stats of the request being handled, or None outside requests.
+    """
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _request_stats.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("metrics_query_start")
+    if starts:
+        stats.db_seconds += time.perf_counter() - starts.pop()
+    stats.queries += 1
+
+
+def instrument_engine(engine):
+    """
+    Counts and times the SQL statements an engine executes for the current request.
+
+    Args:
+        engine (Engine): Sync engine (use AsyncEngine.sync_engine for async engines).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Adds the time spent in the block to a named phase of the current request.
+
+    Reported in the Server-Timing header; a no-op outside requests.
+    """
+    stats = _request_stats.get()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.phases[name] = stats.phases.get(name, 0.0) + time.perf_counter() - started
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """
+    Formats a Server-Timing header value (durations in milliseconds).
+    """
+    entries = [f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"']
+    entries += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stats.phases.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, SQL work and response size per route.
+
+    Routes are labelled by their path template rather than the raw URL, so
+    path parameters do not create new series. With `server_timing` enabled,
+    the DB time, named phases and total time spent before the response
+    starts are sent in a Server-Timing header.
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    value = server_timing(stats, time.perf_counter() - started)
+                    headers.append((b"server-timing", value.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route_label = stats.route
+            method = scope["method"]
+            request_duration.observe(time.perf_counter() - started, method, route_label, str(status))
+            request_queries.observe(stats.queries, method, route_label)
+            request_db_duration.observe(stats.db_seconds, method, route_label)
+            response_size.observe(size, method, route_label)
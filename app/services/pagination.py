@@ -0,0 +1,51 @@
+import base64
+import binascii
+from datetime import date
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Largest page a client may request
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded.
+    """
+
+
+def encode_cursor(expense_date: date, expense_id: int) -> str:
+    """
+    Builds an opaque cursor pointing at an expense position.
+
+    Args:
+        expense_date (date): Date of the last expense on the page.
+        expense_id (int): ID of the last expense on the page.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    raw = f"{expense_date.isoformat()}|{expense_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Args:
+        cursor (str): Cursor received from the client.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed.
+
+    Returns:
+        tuple[date, int]: Expense date and ID of the last row already returned.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, raw_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return date.fromisoformat(raw_date), int(raw_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError("Invalid cursor") from exc
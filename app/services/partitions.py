@@ -0,0 +1,275 @@
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.database.models import Expense, ExpenseAmountBucket, ExpenseRollup
+from app.services.data_version import bump
+from app.services.rollups import month_start, next_month
+
+logger = logging.getLogger(__name__)
+
+# Catches rows outside every monthly partition so inserts never fail
+DEFAULT_PARTITION = "expenses_default"
+
+# Schema that archived (detached) months are moved to
+ARCHIVE_SCHEMA = "archive"
+
+# pg_advisory_xact_lock key serializing partition DDL between workers
+PARTITION_LOCK_ID = 0x5350454E  # "SPEN"
+
+# Seconds between two runs of the background partition maintenance
+MAINTENANCE_INTERVAL = 24 * 60 * 60
+
+
+def partition_name(month: date) -> str:
+    """
+    Returns the table name of a month's partition, e.g. "expenses_y2026m03".
+    """
+    return f"expenses_y{month.year:04d}m{month.month:02d}"
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Returns the first day of the month `months` after `month`.
+    """
+    year, index = divmod(month.year * 12 + month.month - 1 + months, 12)
+    return date(year, index + 1, 1)
+
+
+def is_partitioned(db: Session) -> bool:
+    """
+    Returns True when the expenses table is a partitioned (PostgreSQL) table.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p"
+        " WHERE p.partrelid = to_regclass('expenses'))"
+    )).scalar()
+
+
+def list_partitions(db: Session) -> list[dict]:
+    """
+    Lists the partitions attached to the expenses table.
+
+    Returns:
+        list[dict]: Name, partition bounds and estimated row count of each partition.
+    """
+    rows = db.execute(text(
+        "SELECT c.relname AS name, pg_get_expr(c.relpartbound, c.oid) AS bounds,"
+        " c.reltuples::bigint AS estimated_rows"
+        " FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+        " WHERE i.inhparent = to_regclass('expenses')"
+        " ORDER BY c.relname"
+    ))
+    return [dict(row._mapping) for row in rows]
+
+
+def create_partition(db: Session, month: date) -> bool:
+    """
+    Creates the partition of one month if it does not exist yet.
+
+    Rows of that month already stored in the default partition are moved
+    into the new partition before it is attached, since PostgreSQL refuses
+    to attach a range that the default partition still holds rows for.
+
+    Args:
+        db (Session): SQLAlchemy database session (PostgreSQL).
+        month (date): Any day of the month.
+
+    Returns:
+        bool: True if the partition was created.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+
+    bounds = {"start": month, "end": next_month(month)}
+    db.execute(text(f"CREATE TABLE {name} (LIKE expenses INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(
+        f"WITH moved AS ("
+        f" DELETE FROM {DEFAULT_PARTITION}"
+        f" WHERE expense_date >= :start AND expense_date < :end RETURNING *)"
+        f" INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    db.execute(text(
+        f"ALTER TABLE expenses ATTACH PARTITION {name}"
+        f" FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+    return True
+
+
+def ensure_partitions(db: Session, months_ahead: int, today: date | None = None) -> list[str]:
+    """
+    Creates the partitions of the current month and the next `months_ahead` months.
+
+    Safe to run concurrently from several workers: partition DDL is
+    serialized with a transaction-level advisory lock. The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session (PostgreSQL).
+        months_ahead (int): Number of future months to prepare.
+        today (date | None): Reference day (defaults to today).
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_ID})
+    current = month_start(today or date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(db, month):
+            created.append(partition_name(month))
+    return created
+
+
+def convert_to_partitioned(db: Session, months_ahead: int) -> int:
+    """
+    Rebuilds the expenses table as a table partitioned by month of expense_date.
+
+    A partition is created for every month from the oldest expense to
+    `months_ahead` months from now, plus a default partition. Rows are
+    copied in the same transaction, so a failure leaves the original table
+    untouched. The primary key becomes (id, expense_date), as PostgreSQL
+    requires the partition key in unique constraints; ids keep coming from
+    the same sequence. The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session (PostgreSQL).
+        months_ahead (int): Number of future months to prepare.
+
+    Raises:
+        ValueError: If the database is not PostgreSQL.
+
+    Returns:
+        int: Number of monthly partitions created.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        raise ValueError("Partitioning requires PostgreSQL")
+    if is_partitioned(db):
+        return 0
+
+    db.execute(text("LOCK TABLE expenses IN ACCESS EXCLUSIVE MODE"))
+    sequence = db.execute(text("SELECT pg_get_serial_sequence('expenses', 'id')")).scalar()
+    oldest = db.execute(text("SELECT min(expense_date) FROM expenses")).scalar()
+
+    db.execute(text(
+        "CREATE TABLE expenses_partitioned (LIKE expenses INCLUDING DEFAULTS)"
+        " PARTITION BY RANGE (expense_date)"
+    ))
+    db.execute(text("ALTER TABLE expenses_partitioned ADD PRIMARY KEY (id, expense_date)"))
+    db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF expenses_partitioned DEFAULT"))
+
+    last = add_months(month_start(date.today()), months_ahead)
+    month = month_start(min(oldest, last)) if oldest else month_start(date.today())
+    created = 0
+    while month <= last:
+        db.execute(text(
+            f"CREATE TABLE {partition_name(month)} PARTITION OF expenses_partitioned"
+            f" FOR VALUES FROM ('{month}') TO ('{next_month(month)}')"
+        ))
+        month = next_month(month)
+        created += 1
+
+    db.execute(text("INSERT INTO expenses_partitioned SELECT * FROM expenses"))
+
+    # The sequence belongs to the old id column and would be dropped with it
+    if sequence:
+        db.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY expenses_partitioned.id"))
+    db.execute(text("DROP TABLE expenses"))
+    db.execute(text("ALTER TABLE expenses_partitioned RENAME TO expenses"))
+    db.execute(text("ALTER INDEX expenses_partitioned_pkey RENAME TO expenses_pkey"))
+    db.execute(text(
+        "ALTER TABLE expenses ADD CONSTRAINT expenses_category_id_fkey"
+        " FOREIGN KEY (category_id) REFERENCES categories (id)"
+    ))
+
+    # Indexes on the parent are created on every partition
+    db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for index in Expense.__table__.indexes:
+        index.create(db.connection())
+
+    return created
+
+
+def detach_month(db: Session, month: date, drop: bool = False) -> str:
+    """
+    Removes one month of expenses from the live table without a bulk DELETE.
+
+    The month's partition is detached (a metadata-only operation), then
+    moved to the archive schema, or dropped. Its rollup and sketch rows are removed
+    and the data version bumped so reports and caches stop including it.
+    The caller commits.
+
+    Args:
+        db (Session): SQLAlchemy database session (PostgreSQL).
+        month (date): Any day of the month to remove.
+        drop (bool): Drop the partition instead of archiving it.
+
+    Raises:
+        ValueError: If the month has no attached partition.
+
+    Returns:
+        str: Qualified name of the archived table, or the dropped table's name.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    attached = db.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_inherits"
+        " WHERE inhparent = to_regclass('expenses') AND inhrelid = to_regclass(:name))"
+    ), {"name": name}).scalar()
+    if not attached:
+        raise ValueError(f"No attached partition for {month:%Y-%m}")
+
+    db.execute(text(f"ALTER TABLE expenses DETACH PARTITION {name}"))
+    if drop:
+        db.execute(text(f"DROP TABLE {name}"))
+        archived = name
+    else:
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        archived = f"{ARCHIVE_SCHEMA}.{name}"
+
+    db.query(ExpenseRollup).filter(ExpenseRollup.month == month).delete(synchronize_session=False)
+    db.query(ExpenseAmountBucket).filter(ExpenseAmountBucket.month == month).delete(synchronize_session=False)
+    bump(db)
+    return archived
+
+
+def _run_maintenance(session_factory, months_ahead: int) -> list[str]:
+    """
+    Creates upcoming partitions in a transaction of its own.
+    """
+    with session_factory() as db:
+        if not is_partitioned(db):
+            return []
+        created = ensure_partitions(db, months_ahead)
+        db.commit()
+        return created
+
+
+async def maintain_partitions(session_factory, months_ahead: int):
+    """
+    Keeps future monthly partitions created, once at startup and then daily.
+
+    Runs in the background (on a thread, with the sync engine) so it never
+    delays startup or requests. Rows for months without a partition land in
+    the default partition in the meantime and are moved when it is created.
+
+    Args:
+        session_factory (sessionmaker): Factory of sync sessions.
+        months_ahead (int): Number of future months to prepare.
+    """
+    while True:
+        try:
+            created = await asyncio.to_thread(_run_maintenance, session_factory, months_ahead)
+            if created:
+                logger.info("Created expense partitions: %s", ", ".join(created))
+        except Exception:
+            logger.exception("Expense partition maintenance failed")
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
@@ -0,0 +1,80 @@
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+
+# Cookie holding the time (epoch seconds) until which a client reads from the primary
+PRIMARY_COOKIE = "spendmind_primary_until"
+
+# Methods that may write: a successful one that committed a write starts
+# the read-your-writes window
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Per write request: whether it committed a data change (None outside such requests)
+_committed_write: ContextVar[dict | None] = ContextVar("committed_write", default=None)
+
+
+def record_committed_write() -> None:
+    """
+    Notes that the request being handled committed a data change.
+
+    Called when a transaction that bumped the data version commits;
+    does nothing outside write requests (e.g. in scripts).
+    """
+    state = _committed_write.get()
+    if state is not None:
+        state["committed"] = True
+
+
+def reads_from_primary(cookies: dict[str, str]) -> bool:
+    """
+    Returns True while the client's read-your-writes window is open.
+
+    Args:
+        cookies (dict[str, str]): Cookies sent with the request.
+    """
+    try:
+        return float(cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware pinning a client's reads to the primary right after it writes.
+
+    A successful write request that committed a data change gets a
+    short-lived cookie; while it is valid, get_read_db hands out primary
+    sessions to that client, so it sees its own writes even if the
+    replica lags behind. Requests that write nothing (e.g. POST
+    /reports/jobs) and other clients keep reading from the replica.
+    """
+
+    def __init__(self, app, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"committed": False}
+        token = _committed_write.set(state)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400 and state["committed"]:
+                cookie = SimpleCookie()
+                cookie[PRIMARY_COOKIE] = f"{time.time() + self.window_seconds:.3f}"
+                cookie[PRIMARY_COOKIE]["max-age"] = int(self.window_seconds) + 1
+                cookie[PRIMARY_COOKIE]["path"] = "/"
+                cookie[PRIMARY_COOKIE]["httponly"] = True
+                cookie[PRIMARY_COOKIE]["samesite"] = "Lax"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie[PRIMARY_COOKIE].OutputString().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _committed_write.reset(token)
@@ -0,0 +1,295 @@
+import asyncio
+import multiprocessing
+import secrets
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+from app.config import settings
+
+# URL prefix of the endpoints each job kind may run
+JOB_PREFIXES = {
+    "report": "/reports",
+    "insight": "/insights",
+    "chart": "/charts",
+}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+# Base URL of the in-process requests made by the workers (never resolved)
+WORKER_BASE_URL = "http://report-jobs"
+
+
+class JobQueueFullError(RuntimeError):
+    """
+    Raised when REPORT_JOB_MAX_JOBS jobs are already pending.
+    """
+
+
+@dataclass
+class Job:
+    """
+    A report, insight or chart computed on the job process pool.
+
+    Attributes:
+        id (str): Opaque job id.
+        kind (str): "report", "insight" or "chart".
+        path (str): GET endpoint the job runs, e.g. "/reports/timeseries".
+        query (str): Canonical query string of the endpoint parameters.
+        key (tuple): Deduplication key: path, query and data version.
+        future (Future): Pool future resolving to (status_code, media_type, body).
+        created_at (float): Wall-clock submission time.
+        finished_at (float | None): Monotonic completion time (None while pending).
+        submissions (int): Requests served by this job, deduplicated ones included.
+    """
+    id: str
+    kind: str
+    path: str
+    query: str
+    key: tuple
+    future: Future
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    submissions: int = 1
+
+    @property
+    def status(self) -> str:
+        # The pool marks a future running as soon as it is dispatched to the
+        # call queue; only the worker knows when it actually starts
+        if not self.future.done():
+            return RUNNING if self.id in _started_ids() else QUEUED
+        return DONE if self.result()[0] < 400 else FAILED
+
+    def result(self) -> tuple[int, str, bytes]:
+        """
+        Returns (status_code, media_type, body) of a finished job.
+
+        A job that raised in the worker (or was cancelled) reports a 500.
+        """
+        if self.future.cancelled():
+            return 500, "text/plain", b"Job cancelled"
+        error = self.future.exception()
+        if error is not None:
+            return 500, "text/plain", f"{type(error).__name__}: {error}".encode()
+        return self.future.result()
+
+
+_jobs: dict[str, Job] = {}
+
+# Pending or recently finished job per deduplication key
+_by_key: dict[tuple, str] = {}
+
+_executor: ProcessPoolExecutor | None = None
+
+# Ids of the jobs workers have started, sent by the workers through _started_queue
+_started: set[str] = set()
+_started_queue = None
+
+# Per worker process: HTTP client bound to the app, its event loop, and
+# the queue announcing started jobs
+_worker_client = None
+_worker_loop = None
+_worker_started = None
+
+
+def _started_ids() -> set[str]:
+    """
+    Returns the ids of the jobs a worker has started (pending or finished).
+    """
+    if _started_queue is not None:
+        while not _started_queue.empty():
+            _started.add(_started_queue.get())
+    return _started
+
+
+def _init_worker(started) -> None:
+    """
+    Imports the app once per worker process and binds an HTTP client to it.
+
+    The client calls the app in-process (no network), through the same
+    routes, validation and caches as the synchronous endpoints. The loop
+    is kept for the life of the process so pooled async connections stay
+    usable between jobs.
+    """
+    global _worker_client, _worker_loop, _worker_started
+    import httpx
+
+    from app.main import app
+
+    _worker_started = started
+    _worker_loop = asyncio.new_event_loop()
+    _worker_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=WORKER_BASE_URL)
+
+
+def run_request(job_id: str, path: str, query: str) -> tuple[int, str, bytes]:
+    """
+    Runs one GET request against the app inside a worker process.
+
+    Returns:
+        tuple[int, str, bytes]: Status code, content type and body of the response.
+    """
+    _worker_started.put(job_id)
+
+    async def request():
+        response = await _worker_client.get(f"{path}?{query}" if query else path)
+        return response.status_code, response.headers.get("content-type", ""), response.content
+
+    return _worker_loop.run_until_complete(request())
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Starts the process pool on first use.
+
+    Workers are spawned rather than forked, so they never inherit the
+    parent's event loop, threads or open database connections.
+    """
+    global _executor, _started_queue
+    if _executor is None:
+        context = multiprocessing.get_context("spawn")
+        _started_queue = context.SimpleQueue()
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.report_job_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(_started_queue,)
+        )
+    return _executor
+
+
+def shutdown() -> None:
+    """
+    Stops the process pool, cancelling jobs that have not started.
+    """
+    global _executor, _started_queue
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _started_queue = None
+
+
+def canonical_query(params: dict) -> str:
+    """
+    Encodes endpoint parameters as a query string that does not depend on their order.
+
+    Lists become repeated parameters (e.g. category_id); None values are dropped.
+    """
+    items = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None:
+            continue
+        values = value if isinstance(value, list) else [value]
+        items.extend((name, str(v).lower() if isinstance(v, bool) else str(v)) for v in values)
+    return urlencode(items)
+
+
+def _forget(job: Job) -> None:
+    del _jobs[job.id]
+    _started.discard(job.id)
+    if _by_key.get(job.key) == job.id:
+        del _by_key[job.key]
+
+
+def _prune() -> None:
+    """
+    Forgets finished jobs older than REPORT_JOB_TTL.
+    """
+    # Collect pending start notices first, so none outlives its job
+    _started_ids()
+    now = time.monotonic()
+    expired = [
+        job for job in _jobs.values()
+        if job.finished_at is not None and now - job.finished_at > settings.report_job_ttl
+    ]
+    for job in expired:
+        _forget(job)
+
+
+def _make_room() -> None:
+    """
+    Keeps at most REPORT_JOB_MAX_JOBS jobs, including the one being added.
+
+    The oldest finished jobs are forgotten first; pending jobs never are.
+
+    Raises:
+        JobQueueFullError: If every kept job is still pending.
+    """
+    excess = len(_jobs) - settings.report_job_max_jobs + 1
+    if excess <= 0:
+        return
+
+    # Jobs are kept in submission order
+    finished = [job for job in _jobs.values() if job.finished_at is not None]
+    for job in finished[:excess]:
+        _forget(job)
+    if len(_jobs) >= settings.report_job_max_jobs:
+        raise JobQueueFullError(f"{len(_jobs)} report jobs are already pending")
+
+
+def submit(kind: str, path: str, params: dict, version: int) -> Job:
+    """
+    Queues an endpoint computation, or joins an identical one.
+
+    A job with the same endpoint, parameters and data version that is still
+    pending, or finished successfully within REPORT_JOB_TTL, is returned
+    instead of starting a new computation. Failed jobs are never reused.
+    At most REPORT_JOB_MAX_JOBS jobs are kept; the oldest finished ones
+    make room for new jobs.
+
+    Args:
+        kind (str): "report", "insight" or "chart".
+        path (str): GET endpoint to run.
+        params (dict): Its query parameters.
+        version (int): Current data version.
+
+    Raises:
+        JobQueueFullError: If REPORT_JOB_MAX_JOBS jobs are pending.
+
+    Returns:
+        Job: The new or shared job.
+    """
+    _prune()
+    query = canonical_query(params)
+    key = (path, query, version)
+
+    existing = _jobs.get(_by_key.get(key))
+    if existing is not None and existing.status != FAILED:
+        existing.submissions += 1
+        return existing
+
+    _make_room()
+    job_id = secrets.token_urlsafe(12)
+    try:
+        future = _get_executor().submit(run_request, job_id, path, query)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): start a fresh pool
+        shutdown()
+        future = _get_executor().submit(run_request, job_id, path, query)
+
+    job = Job(
+        id=job_id,
+        kind=kind,
+        path=path,
+        query=query,
+        key=key,
+        future=future
+    )
+
+    def finished(_):
+        job.finished_at = time.monotonic()
+
+    job.future.add_done_callback(finished)
+    _jobs[job.id] = job
+    _by_key[key] = job.id
+    return job
+
+
+def get(job_id: str) -> Job | None:
+    """
+    Returns a job by id (None if unknown or expired).
+    """
+    _prune()
+    return _jobs.get(job_id)
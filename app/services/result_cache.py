@@ -0,0 +1,239 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import Settings, settings
+from app.services.data_version import current_version
+
+
+class CacheStats:
+    """
+    Hit/miss/eviction counters of a result cache (per process).
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryBackend:
+    """
+    In-process LRU cache with a time-to-live.
+
+    Values are returned as stored, so callers must not mutate them.
+    """
+
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: str, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), **self.stats.as_dict()}
+
+
+class SQLiteBackend:
+    """
+    On-disk LRU cache with a time-to-live, shared by every worker on the host.
+
+    Values are pickled; the file must only be writable by the application.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS result_cache ("
+            " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_result_cache_accessed_at ON result_cache (accessed_at)"
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM result_cache WHERE key = ?", (key,))
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute("UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats.hits += 1
+        return pickle.loads(value)
+
+    def set(self, key: str, value) -> None:
+        now = time.time()
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now + self.ttl, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+            if count > self.max_entries:
+                evicted = self._conn.execute(
+                    "DELETE FROM result_cache WHERE key IN ("
+                    " SELECT key FROM result_cache ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+                self.stats.evictions += evicted
+
+    def describe(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "entries": entries, **self.stats.as_dict()}
+
+
+def build_backend(config: Settings):
+    """
+    Creates the cache backend selected by RESULT_CACHE_BACKEND.
+
+    Args:
+        config (Settings): Deployment settings.
+
+    Raises:
+        ValueError: For an unknown backend name.
+
+    Returns:
+        MemoryBackend | SQLiteBackend | None: The backend, or None when caching is disabled.
+    """
+    if config.result_cache_backend == "none":
+        return None
+    if config.result_cache_backend == "memory":
+        return MemoryBackend(config.result_cache_max_entries, config.result_cache_ttl)
+    if config.result_cache_backend == "sqlite":
+        return SQLiteBackend(config.result_cache_path, config.result_cache_max_entries, config.result_cache_ttl)
+    raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {config.result_cache_backend!r}")
+
+
+backend = build_backend(settings)
+
+
+def cache_key(endpoint: str, params: dict, version: int) -> str:
+    """
+    Builds the cache key of an endpoint result.
+
+    Args:
+        endpoint (str): Endpoint path.
+        params (dict): Query parameters that affect the result.
+        version (int): Data version the result is computed at.
+
+    Returns:
+        str: Key such as "/reports/monthly?start_date=2025-01-01@v42".
+    """
+    query = "&".join(f"{name}={value}" for name, value in sorted(params.items()) if value is not None)
+    return f"{endpoint}?{query}@v{version}"
+
+
+async def cached(db: AsyncSession, endpoint: str, params: dict, compute: Callable[[], Awaitable]):
+    """
+    Returns an endpoint result from the cache, computing and storing it on a miss.
+
+    The key embeds the current data version, so any write to expenses or
+    categories makes previous entries unreachable; they then age out
+    through LRU eviction or their TTL.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        endpoint (str): Endpoint path.
+        params (dict): Query parameters that affect the result.
+        compute (Callable[[], Awaitable]): Computes the result on a miss.
+
+    Returns:
+        The cached or freshly computed result.
+    """
+    if backend is None:
+        return await compute()
+
+    key = cache_key(endpoint, params, await db.run_sync(current_version))
+
+    if backend.blocking:
+        value = await run_in_threadpool(backend.get, key)
+    else:
+        value = backend.get(key)
+    if value is not None:
+        return value
+
+    value = await compute()
+
+    if backend.blocking:
+        await run_in_threadpool(backend.set, key, value)
+    else:
+        backend.set(key, value)
+    return value
+
+
+def describe() -> dict:
+    """
+    Returns the backend name, size and counters of the result cache.
+    """
+    if backend is None:
+        return {"backend": "none"}
+    return backend.describe()
@@ -0,0 +1,325 @@
+from collections import Counter
+from datetime import date
+
+from sqlalchemy import Date, cast, event, func, inspect, select, delete, insert, update, literal, literal_column, type_coerce
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database.models import Expense, ExpenseRollup
+from app.services import distributions
+from app.services.data_version import bump
+
+# Rollup key used for expenses without a category
+UNCATEGORIZED = 0
+
+rollups = ExpenseRollup.__table__
+expenses = Expense.__table__
+
+
+def month_start(value: date) -> date:
+    """
+    Returns the first day of the month of the given date.
+    """
+    return value.replace(day=1)
+
+
+def next_month(value: date) -> date:
+    """
+    Returns the first day of the month following the given date.
+    """
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def rollup_key(expense_date: date, category_id: int | None) -> tuple[date, int]:
+    """
+    Builds the (month, category) key an expense is aggregated under.
+
+    Args:
+        expense_date (date): Date of the expense.
+        category_id (int | None): Category of the expense.
+
+    Returns:
+        tuple[date, int]: First day of the month and category ID.
+    """
+    return month_start(expense_date), category_id if category_id is not None else UNCATEGORIZED
+
+
+def month_start_sql(dialect_name: str, column):
+    """
+    SQL expression truncating a date column to the first day of its month.
+
+    The unit is rendered inline rather than as a bound parameter so the same
+    expression can appear in both SELECT and GROUP BY with server-side binds.
+
+    Args:
+        dialect_name (str): Name of the database dialect.
+        column (ColumnElement): Date column to truncate.
+
+    Raises:
+        NotImplementedError: For unsupported databases.
+
+    Returns:
+        ColumnElement: Date expression.
+    """
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(literal_column("'month'"), column), Date)
+    if dialect_name == "sqlite":
+        return type_coerce(func.date(column, literal_column("'start of month'")), Date)
+    if dialect_name in ("mysql", "mariadb"):
+        # MySQL drivers interpolate parameters client-side, so a bound format is safe
+        return cast(func.date_format(column, "%Y-%m-01"), Date)
+    raise NotImplementedError(f"Rollups are not supported on {dialect_name}")
+
+
+def _upsert_statement(dialect_name: str):
+    """
+    Builds an INSERT that adds to an existing rollup row instead of failing.
+
+    Returns None for dialects without a native upsert.
+    """
+    if dialect_name in ("postgresql", "sqlite"):
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            least, greatest = func.least, func.greatest
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            # SQLite's scalar min()/max() accept several arguments
+            least, greatest = func.min, func.max
+
+        stmt = dialect_insert(rollups)
+        return stmt.on_conflict_do_update(
+            index_elements=[rollups.c.month, rollups.c.category_id],
+            set_={
+                "total": rollups.c.total + stmt.excluded.total,
+                "count": rollups.c.count + stmt.excluded.count,
+                "min_amount": least(rollups.c.min_amount, stmt.excluded.min_amount),
+                "max_amount": greatest(rollups.c.max_amount, stmt.excluded.max_amount),
+            }
+        )
+
+    if dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+
+        stmt = dialect_insert(rollups)
+        return stmt.on_duplicate_key_update(
+            total=rollups.c.total + stmt.inserted.total,
+            count=rollups.c.count + stmt.inserted.count,
+            min_amount=func.least(rollups.c.min_amount, stmt.inserted.min_amount),
+            max_amount=func.greatest(rollups.c.max_amount, stmt.inserted.max_amount),
+        )
+
+    return None
+
+
+def add_expenses(conn: Connection, new_expenses) -> None:
+    """
+    Adds newly inserted expenses to their rollup rows.
+
+    Expenses are first aggregated in memory so each (month, category) pair
+    costs a single upsert, which keeps bulk loads cheap. Their amounts are
+    added to the pair's quantile sketch as well.
+
+    Args:
+        conn (Connection): Connection of the transaction that inserted the expenses.
+        new_expenses (Iterable): Objects with amount, expense_date and category_id attributes.
+    """
+    deltas = {}
+    bucket_counts = Counter()
+    for expense in new_expenses:
+        key = rollup_key(expense.expense_date, expense.category_id)
+        amount = expense.amount
+        bucket_counts[(*key, distributions.bucket_index(amount))] += 1
+        if key in deltas:
+            delta = deltas[key]
+            delta["total"] += amount
+            delta["count"] += 1
+            delta["min_amount"] = min(delta["min_amount"], amount)
+            delta["max_amount"] = max(delta["max_amount"], amount)
+        else:
+            deltas[key] = {
+                "month": key[0],
+                "category_id": key[1],
+                "total": amount,
+                "count": 1,
+                "min_amount": amount,
+                "max_amount": amount,
+            }
+
+    if not deltas:
+        return
+
+    distributions.add_counts(conn, bucket_counts)
+
+    stmt = _upsert_statement(conn.dialect.name)
+    if stmt is not None:
+        conn.execute(stmt, list(deltas.values()))
+        return
+
+    # Fallback for dialects without upsert: update, then insert missing rows
+    for delta in deltas.values():
+        result = conn.execute(
+            update(rollups)
+            .where(
+                rollups.c.month == delta["month"],
+                rollups.c.category_id == delta["category_id"]
+            )
+            .values(
+                total=rollups.c.total + delta["total"],
+                count=rollups.c.count + delta["count"],
+                min_amount=func.least(rollups.c.min_amount, delta["min_amount"]),
+                max_amount=func.greatest(rollups.c.max_amount, delta["max_amount"]),
+            )
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(rollups).values(**delta))
+
+
+def refresh_keys(conn: Connection, keys) -> None:
+    """
+    Recomputes the given rollup rows from the expenses table.
+
+    Used after updates and deletes, where min/max and the amount sketches
+    cannot be maintained incrementally. Each key only reads one month of one
+    category, which the (category_id, expense_date) index serves directly.
+
+    Args:
+        conn (Connection): Connection of the transaction that changed the expenses.
+        keys (Iterable[tuple[date, int]]): (month, category_id) pairs to recompute.
+    """
+    for month, category_id in keys:
+        if category_id == UNCATEGORIZED:
+            category_filter = expenses.c.category_id.is_(None)
+        else:
+            category_filter = expenses.c.category_id == category_id
+
+        in_key = (
+            category_filter,
+            expenses.c.expense_date >= month,
+            expenses.c.expense_date < next_month(month)
+        )
+        totals = conn.execute(
+            select(
+                func.sum(expenses.c.amount).label("total"),
+                func.count().label("count"),
+                func.min(expenses.c.amount).label("min_amount"),
+                func.max(expenses.c.amount).label("max_amount")
+            )
+            .where(*in_key)
+        ).one()
+        distributions.replace_counts(
+            conn, month, category_id, conn.execute(select(expenses.c.amount).where(*in_key)).scalars()
+        )
+
+        conn.execute(
+            delete(rollups).where(
+                rollups.c.month == month,
+                rollups.c.category_id == category_id
+            )
+        )
+        if totals.count:
+            conn.execute(
+                insert(rollups).values(
+                    month=month,
+                    category_id=category_id,
+                    total=totals.total,
+                    count=totals.count,
+                    min_amount=totals.min_amount,
+                    max_amount=totals.max_amount
+                )
+            )
+
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Rebuilds every rollup row from scratch.
+
+    Intended for repairs (e.g. after writing expenses outside the API) and
+    for backfilling an existing database. The amount sketches are rebuilt too.
+
+    Args:
+        db (Session): SQLAlchemy database session. The caller commits.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    conn = db.connection()
+    month = month_start_sql(conn.dialect.name, expenses.c.expense_date).label("month")
+    category_id = func.coalesce(expenses.c.category_id, literal(UNCATEGORIZED)).label("category_id")
+
+    conn.execute(delete(rollups))
+    bump(db)
+    conn.execute(
+        insert(rollups).from_select(
+            ["month", "category_id", "total", "count", "min_amount", "max_amount"],
+            select(
+                month,
+                category_id,
+                func.sum(expenses.c.amount),
+                func.count(),
+                func.min(expenses.c.amount),
+                func.max(expenses.c.amount)
+            )
+            .group_by(month, category_id)
+        )
+    )
+    distributions.rebuild(conn, month, category_id)
+    return conn.execute(select(func.count()).select_from(rollups)).scalar()
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_stale_rollups(session, flush_context, instances):
+    """
+    Records which rollup rows an upcoming flush of updated/deleted expenses invalidates.
+
+    The previous (month, category) of each changed expense is read from the
+    database before the UPDATE/DELETE runs, since the in-memory history may
+    not hold it.
+    """
+    changed = [
+        obj for obj in session.deleted if isinstance(obj, Expense)
+    ]
+    for obj in session.dirty:
+        if not isinstance(obj, Expense):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in ("amount", "expense_date", "category_id")):
+            changed.append(obj)
+
+    if not changed:
+        return
+
+    stale = session.info.setdefault("stale_rollup_keys", set())
+    ids = [obj.id for obj in changed if obj.id is not None]
+    if ids:
+        previous = session.connection().execute(
+            select(expenses.c.expense_date, expenses.c.category_id)
+            .where(expenses.c.id.in_(ids))
+        )
+        stale.update(rollup_key(row.expense_date, row.category_id) for row in previous)
+
+    # The new position of updated expenses changes as well
+    stale.update(
+        rollup_key(obj.expense_date, obj.category_id)
+        for obj in changed if obj not in session.deleted
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollups(session, flush_context):
+    """
+    Applies the flushed expense changes to the rollup table in the same transaction.
+    """
+    stale = session.info.pop("stale_rollup_keys", set())
+    new_expenses = [
+        obj for obj in session.new
+        if isinstance(obj, Expense) and rollup_key(obj.expense_date, obj.category_id) not in stale
+    ]
+
+    if not new_expenses and not stale:
+        return
+
+    conn = session.connection()
+    add_expenses(conn, new_expenses)
+    refresh_keys(conn, stale)
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.services.metrics import current_request
+
+logger = logging.getLogger(__name__)
+
+# Longest parameter repr kept per entry
+MAX_PARAMETERS_LENGTH = 2000
+
+# Statements that can be re-run under EXPLAIN ANALYZE. WITH is excluded: a
+# data-modifying CTE would apply its writes a second time
+EXPLAINABLE_PREFIXES = ("SELECT",)
+
+
+class SlowQueryLog:
+    """
+    Bounded ring buffer of statements that exceeded the slow-query threshold.
+
+    Attributes:
+        threshold_ms (float): Statements at or above this duration are recorded (0 disables).
+        size (int): Maximum number of entries kept; the oldest are dropped first.
+        explain (bool): Capture EXPLAIN (ANALYZE, BUFFERS) plans of slow SELECTs on PostgreSQL.
+    """
+
+    def __init__(self, threshold_ms: float, size: int, explain: bool):
+        self.threshold_ms = threshold_ms
+        self.size = size
+        self.explain = explain
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        # At most one EXPLAIN runs at a time so a burst of slow queries
+        # does not double the load on the database
+        self._explaining = threading.Lock()
+
+    def record(self, entry: dict) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> list[dict]:
+        """
+        Returns the recorded statements, newest first.
+        """
+        with self._lock:
+            return [dict(entry) for entry in reversed(self._entries)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def begin_explain(self) -> bool:
+        """
+        Claims the single plan-capture slot; False if a capture is already running.
+        """
+        return self._explaining.acquire(blocking=False)
+
+    def end_explain(self) -> None:
+        self._explaining.release()
+
+
+log = SlowQueryLog(settings.slow_query_ms, settings.slow_query_log_size, settings.slow_query_explain)
+
+# Runs plans for the sync engine (scripts) off the calling thread
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+# Pending plan captures of the async engine (tasks are only weakly referenced by the loop)
+_explain_tasks = set()
+
+
+def is_explainable(dialect_name: str, statement: str) -> bool:
+    """
+    Returns True for plain SELECTs (no row locks) on PostgreSQL.
+    """
+    head = statement.lstrip().upper()
+    return dialect_name == "postgresql" and head.startswith(EXPLAINABLE_PREFIXES) and "FOR UPDATE" not in head
+
+
+def _explain_sync(engine, entry: dict, statement: str, parameters):
+    """
+    Captures the plan of a slow statement from the sync engine.
+    """
+    try:
+        with engine.connect() as conn:
+            # EXPLAIN ANALYZE executes the statement: run it read-only and never commit
+            transaction = conn.begin()
+            try:
+                conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+            finally:
+                transaction.rollback()
+        entry["plan"] = "\n".join(row[0] for row in rows)
+    except Exception as exc:
+        entry["plan_error"] = str(exc)
+    finally:
+        log.end_explain()
+
+
+async def _explain_async(async_engine, entry: dict, statement: str, parameters):
+    """
+    Captures the plan of a slow statement from the async engine, on its own connection.
+    """
+    try:
+        async with async_engine.connect() as conn:
+            # EXPLAIN ANALYZE executes the statement: run it read-only and never commit
+            transaction = await conn.begin()
+            try:
+                await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                rows = result.all()
+            finally:
+                await transaction.rollback()
+        entry["plan"] = "\n".join(row[0] for row in rows)
+    except Exception as exc:
+        entry["plan_error"] = str(exc)
+    finally:
+        log.end_explain()
+
+
+def instrument_engine(engine, async_engine=None):
+    """
+    Records statements of an engine that exceed the slow-query threshold.
+
+    Each entry holds the statement, its bound parameters, the route of the
+    request that issued it and, for SELECTs on PostgreSQL, the EXPLAIN
+    (ANALYZE, BUFFERS) plan. The plan is captured in the background on a
+    separate connection, re-running the statement in a read-only
+    transaction that is rolled back, so the slow request is not delayed
+    further.
+
+    Args:
+        engine (Engine): Sync engine to watch (AsyncEngine.sync_engine for async engines).
+        async_engine (AsyncEngine | None): Async engine owning `engine`, used to run its plans.
+    """
+    if log.threshold_ms <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _check_duration(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if duration_ms < log.threshold_ms or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+
+        request = current_request()
+        entry = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration_ms, 3),
+            "route": request.route if request is not None else None,
+            "statement": statement,
+            "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            "plan": None,
+        }
+        log.record(entry)
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s %s",
+            duration_ms, entry["route"] or "-", statement, entry["parameters"]
+        )
+
+        if executemany or not log.explain or not is_explainable(conn.dialect.name, statement):
+            return
+        if not log.begin_explain():
+            return
+
+        if async_engine is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                log.end_explain()
+                return
+            task = loop.create_task(_explain_async(async_engine, entry, statement, parameters))
+            _explain_tasks.add(task)
+            task.add_done_callback(_explain_tasks.discard)
+        else:
+            _explain_executor.submit(_explain_sync, engine, entry, statement, parameters)
@@ -0,0 +1,213 @@
+import calendar
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import aggregation
+from app.services.analytics_engine import from_cents, to_cents, to_day
+from app.services.rollups import month_start
+
+# Granularities accepted by /reports/timeseries
+GRANULARITIES = ("day", "week", "month")
+
+# Trailing windows (days) of the moving averages
+MOVING_AVERAGE_WINDOWS = (7, 30)
+
+# Window whose daily rate projects the rest of the month
+PROJECTION_WINDOW = 30
+
+# Days of history the trailing windows need before the first reported day
+LEAD_IN_DAYS = max(MOVING_AVERAGE_WINDOWS) - 1
+
+# Earliest end date: month to date is compared with the previous month
+FIRST_END_DATE = date(1, 2, 1)
+
+
+def days_before(day: date, days: int) -> date:
+    """
+    Returns the date `days` days before `day`, clamped to date.min.
+    """
+    return day - timedelta(days=min(days, (day - date.min).days))
+
+
+def same_day_last_month(day: date) -> date:
+    """
+    Returns the same day of the previous month, clamped to that month's length.
+    """
+    previous = month_start(day) - timedelta(days=1)
+    return previous.replace(day=min(day.day, previous.day))
+
+
+async def daily_cents(
+    db: AsyncSession,
+    first_day: date,
+    last_day: date,
+    category_id: int | None
+) -> np.ndarray:
+    """
+    Builds the dense daily spend series (in cents) from one aggregate query.
+
+    Days without expenses are zeros. With ANALYTICS_ENGINE the day totals
+    come from the in-memory snapshot instead of the database (see
+    aggregation.aggregate).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        first_day (date): First day of the series.
+        last_day (date): Last day of the series.
+        category_id (int | None): Only include this category.
+
+    Returns:
+        np.ndarray: int64 cents, one element per day from first_day to last_day.
+    """
+    series = np.zeros((last_day - first_day).days + 1, dtype=np.int64)
+    offset = to_day(first_day)
+
+    rows = await aggregation.aggregate(
+        db,
+        granularity="day",
+        start_date=first_day,
+        end_date=last_day,
+        category_ids=[category_id] if category_id else None
+    )
+    for row in rows:
+        series[to_day(row.period) - offset] = to_cents(row.total)
+    return series
+
+
+def trailing_means(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of each element and the `window - 1` elements before it (NaN until the window is full).
+    """
+    sums = np.cumsum(np.concatenate(([0], values)), dtype=np.float64)
+    means = np.full(len(values), np.nan)
+    if len(values) >= window:
+        means[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return means
+
+
+def period_starts(first_day: date, days: int, granularity: str) -> np.ndarray:
+    """
+    Returns the start of the period (day, Monday of the ISO week, or first of the month) of each day.
+    """
+    dates = np.arange(np.datetime64(first_day, "D"), np.datetime64(first_day, "D") + days)
+    if granularity == "week":
+        # Day 0 (1970-01-01) is a Thursday
+        return dates - (dates.astype(np.int64) + 3) % 7
+    if granularity == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]")
+    return dates
+
+
+def money(cents: float) -> Decimal | None:
+    """
+    Converts a (possibly fractional or NaN) cent value to money, None for NaN.
+    """
+    return None if np.isnan(cents) else from_cents(round(cents))
+
+
+async def build_timeseries(
+    db: AsyncSession,
+    granularity: str,
+    start_date: date | None,
+    end_date: date | None,
+    category_id: int | None
+) -> dict:
+    """
+    Computes the spend series, moving averages, month-to-date comparison and projection.
+
+    One aggregate query loads the daily totals of the whole window (the
+    requested range, the lead-in of the moving averages and the previous
+    month); everything else is vectorized over that dense array.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+        granularity (str): "day", "week" or "month".
+        start_date (date | None): First day reported (defaults to one year before end_date).
+        end_date (date | None): Last day reported, also the month-to-date reference day (defaults to today).
+        category_id (int | None): Only include this category.
+
+    Raises:
+        ValueError: For an unknown granularity, a start after the end or an
+            end before FIRST_END_DATE.
+
+    Returns:
+        dict: Points per period, month_to_date and projection, amounts as Decimals.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity!r}")
+
+    end_date = end_date or date.today()
+    if end_date < FIRST_END_DATE:
+        raise ValueError(f"end_date must not be before {FIRST_END_DATE.isoformat()}")
+    start_date = start_date or days_before(end_date, 364)
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date")
+
+    # Whole periods only, so the first week/month total is not truncated
+    start_date = period_starts(start_date, 1, granularity)[0].item()
+
+    previous_month = month_start(same_day_last_month(end_date))
+    # Nothing precedes date.min: the moving averages of the first days stay empty
+    first_day = min(days_before(start_date, LEAD_IN_DAYS), previous_month)
+    cents = await daily_cents(db, first_day, end_date, category_id)
+    averages = {window: trailing_means(cents, window) for window in MOVING_AVERAGE_WINDOWS}
+
+    # Reported range within the loaded window
+    first = (start_date - first_day).days
+    reported = cents[first:]
+    starts = period_starts(start_date, len(reported), granularity)
+    boundaries = np.flatnonzero(np.concatenate(([True], starts[1:] != starts[:-1])))
+    totals = np.add.reduceat(reported, boundaries)
+    last_days = np.concatenate((boundaries[1:] - 1, [len(reported) - 1])) + first
+
+    points = [
+        {
+            "period": _period_label(starts[boundary].item(), granularity),
+            "total": from_cents(total),
+            **{f"ma{window}": money(averages[window][last_day]) for window in MOVING_AVERAGE_WINDOWS},
+        }
+        for boundary, total, last_day in zip(boundaries, totals, last_days)
+    ]
+
+    # Month to date vs. the same days of the previous month
+    month_first = month_start(end_date)
+    mtd = int(cents[(month_first - first_day).days:].sum())
+    previous_last = same_day_last_month(end_date)
+    previous_mtd = int(cents[(previous_month - first_day).days:(previous_last - first_day).days + 1].sum())
+    change = (mtd - previous_mtd) / previous_mtd * 100 if previous_mtd else None
+
+    # End-of-month projection at the trailing 30-day daily rate
+    days_in_month = calendar.monthrange(end_date.year, end_date.month)[1]
+    days_remaining = days_in_month - end_date.day
+    daily_rate = averages[PROJECTION_WINDOW][-1]
+
+    return {
+        "granularity": granularity,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "points": points,
+        "month_to_date": {
+            "as_of": end_date.isoformat(),
+            "total": from_cents(mtd),
+            "previous_period_total": from_cents(previous_mtd),
+            "change_pct": round(change, 1) if change is not None else None,
+        },
+        "projection": {
+            "month": end_date.strftime("%Y-%m"),
+            "daily_rate": money(daily_rate),
+            "days_remaining": days_remaining,
+            "projected_total": money(mtd + daily_rate * days_remaining),
+        },
+    }
+
+
+def _period_label(start: date, granularity: str) -> str:
+    """
+    Formats a period start: ISO date for days and weeks, "YYYY-MM" for months.
+    """
+    if granularity == "month":
+        return start.strftime("%Y-%m")
+    return start.isoformat()
@@ -0,0 +1,183 @@
+"""
+Compares ad-hoc aggregations served by the in-memory analytics snapshot
+against the same aggregations in SQL.
+
+A throwaway SQLite database is filled with random expenses, then each query
+is timed through the database and through ColumnarSnapshot.aggregate:
+
+    python -m benchmarks.analytics_engine --rows 1000000 10000000
+
+SQLite keeps the comparison self-contained; point --database-url at a
+PostgreSQL database (with empty tables, one --rows size per run) to
+compare against it.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+from sqlalchemy import create_engine, extract, func, insert, select, text
+
+from app.database.models import Base, Category, Expense
+from app.services.analytics_engine import EPOCH, ColumnarSnapshot, from_day, to_day
+
+CATEGORIES = 12
+FIRST_DAY = date(2015, 1, 1)
+LAST_DAY = date(2025, 12, 31)
+INSERT_CHUNK = 50_000
+
+# Range that does not line up with months, so rollups cannot answer it
+RANGE = (date(2019, 3, 17), date(2023, 8, 9))
+CATEGORY_IDS = [2, 5, 7]
+
+
+def fill(engine, rows: int, seed: int) -> None:
+    """
+    Inserts `rows` random expenses (and the categories they reference).
+    """
+    rng = np.random.default_rng(seed)
+    first, last = to_day(FIRST_DAY), to_day(LAST_DAY)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Category), [{"id": i, "name": f"Category {i}"} for i in range(1, CATEGORIES + 1)])
+
+        for offset in range(0, rows, INSERT_CHUNK):
+            size = min(INSERT_CHUNK, rows - offset)
+            days = rng.integers(first, last + 1, size)
+            cents = rng.integers(100, 50_000, size)
+            categories = rng.integers(1, CATEGORIES + 1, size)
+            conn.execute(insert(Expense), [
+                {
+                    "amount": int(amount) / 100,
+                    "description": "benchmark",
+                    "expense_date": from_day(day),
+                    "category_id": int(category),
+                }
+                for day, amount, category in zip(days, cents, categories)
+            ])
+
+
+def load(engine) -> ColumnarSnapshot:
+    """
+    Builds a snapshot the way analytics_engine.load_snapshot does, synchronously.
+    """
+    snapshot = ColumnarSnapshot()
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=100_000).execute(
+            select(Expense.expense_date, func.round(Expense.amount * 100), Expense.category_id)
+        )
+        for rows in result.partitions():
+            days, cents, categories = zip(*rows)
+            snapshot.append([(d - EPOCH).days for d in days], cents, categories)
+    return snapshot
+
+
+def sql_queries(engine) -> dict:
+    """
+    The SQL side of each comparison, as callables returning all rows.
+    """
+    start, end = RANGE
+    in_range = (Expense.expense_date >= start, Expense.expense_date <= end)
+    if engine.dialect.name == "sqlite":
+        weekday = func.strftime("%w", Expense.expense_date)
+    else:
+        weekday = extract("dow", Expense.expense_date)
+
+    statements = {
+        "total in range": select(func.sum(Expense.amount), func.count()).where(*in_range),
+        "by weekday in range": (
+            select(weekday, func.sum(Expense.amount), func.count()).where(*in_range).group_by(weekday)
+        ),
+        "by day, 3 categories": (
+            select(Expense.expense_date, func.sum(Expense.amount), func.count())
+            .where(*in_range, Expense.category_id.in_(CATEGORY_IDS))
+            .group_by(Expense.expense_date)
+        ),
+        "by category, all time": (
+            select(Expense.category_id, func.sum(Expense.amount), func.count()).group_by(Expense.category_id)
+        ),
+    }
+
+    def run(statement):
+        with engine.connect() as conn:
+            return conn.execute(statement).all()
+
+    return {label: (lambda s=statement: run(s)) for label, statement in statements.items()}
+
+
+def snapshot_queries(snapshot: ColumnarSnapshot) -> dict:
+    """
+    The snapshot side of each comparison.
+    """
+    start, end = RANGE
+    return {
+        "total in range": lambda: snapshot.aggregate(None, start, end),
+        "by weekday in range": lambda: snapshot.aggregate("weekday", start, end),
+        "by day, 3 categories": lambda: snapshot.aggregate("day", start, end, CATEGORY_IDS),
+        "by category, all time": lambda: snapshot.aggregate("category"),
+    }
+
+
+def timed(fn, repeat: int) -> float:
+    """
+    Median wall time of `fn` in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(rows: int, database_url: str | None, repeat: int, seed: int) -> None:
+    """
+    Benchmarks one dataset size and prints a comparison table.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        Base.metadata.create_all(engine)
+
+        print(f"\n{rows:,} expenses: loading...", flush=True)
+        fill(engine, rows, seed)
+        if engine.dialect.name == "sqlite":
+            with engine.connect() as conn:
+                conn.execute(text("ANALYZE"))
+
+        started = time.perf_counter()
+        snapshot = load(engine)
+        load_ms = (time.perf_counter() - started) * 1000
+        memory_mb = (snapshot.days.nbytes + snapshot.cents.nbytes + snapshot.categories.nbytes) / 2**20
+        print(f"snapshot load {load_ms:,.0f} ms, {memory_mb:.1f} MB")
+
+        sql, columnar = sql_queries(engine), snapshot_queries(snapshot)
+        print(f"{'query':<24}{'sql ms':>10}{'numpy ms':>10}{'speedup':>9}")
+        for label in sql:
+            sql_ms = timed(sql[label], repeat)
+            numpy_ms = timed(columnar[label], repeat)
+            print(f"{label:<24}{sql_ms:>10.1f}{numpy_ms:>10.1f}{sql_ms / numpy_ms:>8.1f}x")
+
+        engine.dispose()
+
+
+def main():
+    """
+    Runs the benchmark for each requested dataset size.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                        help="Dataset sizes (default: 1000000 10000000)")
+    parser.add_argument("--database-url", help="Empty database to use instead of a temporary SQLite file")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query, median reported (default: 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows, args.database_url, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Compares requests/sec of the async API against the previous sync (threadpool) path.
+
+Both apps run under uvicorn in separate processes against the database
+configured in app/database/connection.py, and are driven by the same
+concurrent client:
+
+    python -m benchmarks.async_throughput --concurrency 200 --duration 15
+
+The sync baseline reproduces the old GET /expenses/ handler (sync `def`
+with the `get_db` dependency), so the only difference is the session type.
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.orm import Session
+
+from app.database.connection import get_db
+from app.database.models import Category, Expense
+
+ENDPOINT = "/expenses/?limit=50"
+
+# Sync baseline app, started with: uvicorn benchmarks.async_throughput:sync_app
+sync_app = FastAPI(title="SpendMind sync baseline")
+
+
+@sync_app.get("/expenses/")
+def sync_get_expenses(limit: int = 50, db: Session = Depends(get_db)):
+    """
+    The pre-async GET /expenses/ handler, kept only as a benchmark baseline.
+    """
+    rows = (
+        db.query(
+            Expense.id,
+            Expense.amount,
+            Expense.description,
+            Expense.expense_date,
+            Expense.category_id,
+            Category.name.label("category_name")
+        )
+        .join(Category)
+        .order_by(Expense.expense_date.desc(), Expense.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [dict(row._mapping) for row in rows]
+
+
+def start_server(app_path: str, port: int) -> subprocess.Popen:
+    """
+    Starts uvicorn for an app in a child process and waits until it answers.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--port", str(port), "--log-level", "warning"]
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}{ENDPOINT}", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f"{app_path} did not start on port {port}")
+
+
+async def drive(base_url: str, concurrency: int, duration: float) -> dict:
+    """
+    Sends requests from `concurrency` clients for `duration` seconds.
+
+    Returns:
+        dict: Throughput, error count and latency percentiles (ms).
+    """
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(ENDPOINT)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": quantiles[49],
+        "p99_ms": quantiles[98],
+    }
+
+
+def main():
+    """
+    Runs the benchmark for both apps and prints a comparison table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=200, help="Concurrent clients (default: 200)")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per app (default: 15)")
+    parser.add_argument("--port", type=int, default=8100, help="First port to use (default: 8100)")
+    args = parser.parse_args()
+
+    apps = {
+        "sync (threadpool)": "benchmarks.async_throughput:sync_app",
+        "async (AsyncSession)": "app.main:app",
+    }
+
+    results = {}
+    for offset, (label, app_path) in enumerate(apps.items()):
+        port = args.port + offset
+        process = start_server(app_path, port)
+        try:
+            results[label] = asyncio.run(drive(f"http://127.0.0.1:{port}", args.concurrency, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"GET {ENDPOINT} with {args.concurrency} concurrent clients, {args.duration:.0f}s each")
+    print(f"{'path':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for label, result in results.items():
+        print(
+            f"{label:<22}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
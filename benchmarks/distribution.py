@@ -0,0 +1,179 @@
+"""
+Checks the accuracy and latency of /reports/distribution's amount sketches
+against exact percentiles.
+
+By default, random heavy-tailed amounts are sketched per (month, category)
+in memory and each range is compared with NumPy's linear percentile (the
+same definition as SQL percentile_cont):
+
+    python -m benchmarks.distribution --rows 1000000 10000000
+
+With --database-url pointing at a PostgreSQL database filled through the
+API (or rebuilt with scripts.rebuild_rollups), the stored sketches are
+compared with percentile_cont over the expenses table instead:
+
+    python -m benchmarks.distribution --database-url postgresql://...
+
+Exits with status 1 when a relative error exceeds --max-error.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from app.services.distributions import RELATIVE_ACCURACY, _LOG_GAMMA, AmountSketch, merge_rows, sketch_query
+from app.services.partitions import add_months
+from app.services.rollups import next_month
+
+QUANTILES = (0.5, 0.9, 0.99)
+CATEGORIES = 12
+MONTHS = 120
+
+# (label, first month, last month, categories) as month offsets from the first month
+RANGES = [
+    ("all", None, None, None),
+    ("one category", None, None, [3]),
+    ("two years", 24, 47, None),
+    ("one month, 3 categories", 60, 60, [2, 5, 7]),
+]
+
+
+def timed(fn, repeat: int):
+    """
+    Returns the result of fn and its median duration in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return result, statistics.median(durations)
+
+
+def relative_error(estimate: float, exact: float) -> float:
+    return abs(estimate - exact) / abs(exact) if exact else abs(estimate)
+
+
+def build_buckets(months: np.ndarray, categories: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+    """
+    Builds the expense_amount_buckets rows (month, category, bucket, count) the write path would store.
+    """
+    indexes = np.ceil(np.log(amounts) / _LOG_GAMMA).astype(np.int64)
+    keys, counts = np.unique(np.stack([months, categories, indexes]), axis=1, return_counts=True)
+    return np.vstack([keys, counts])
+
+
+def run_synthetic(rows: int, repeat: int, seed: int) -> float:
+    """
+    Compares sketch and exact quantiles on random data; returns the worst relative error.
+    """
+    rng = np.random.default_rng(seed)
+    months = rng.integers(0, MONTHS, rows)
+    categories = rng.integers(1, CATEGORIES + 1, rows)
+    amounts = np.round(rng.lognormal(3.0, 1.2, rows), 2).clip(0.01)
+
+    started = time.perf_counter()
+    bucket_months, bucket_categories, bucket_indexes, bucket_counts = build_buckets(months, categories, amounts)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"\n{rows:,} expenses: {len(bucket_counts):,} bucket rows, built in {build_ms:,.0f} ms")
+    print(f"{'range':<26}{'quantile':>9}{'exact':>10}{'sketch':>10}{'error':>8}{'exact ms':>10}{'sketch ms':>10}")
+
+    worst = 0.0
+    for label, first, last, category_ids in RANGES:
+        mask = np.ones(rows, dtype=bool)
+        bucket_mask = np.ones(len(bucket_counts), dtype=bool)
+        if first is not None:
+            mask &= (months >= first) & (months <= last)
+            bucket_mask &= (bucket_months >= first) & (bucket_months <= last)
+        if category_ids:
+            mask &= np.isin(categories, category_ids)
+            bucket_mask &= np.isin(bucket_categories, category_ids)
+
+        def merged():
+            # Same work as the endpoint: sum counts per bucket (SQL GROUP BY), then one sketch
+            indexes, inverse = np.unique(bucket_indexes[bucket_mask], return_inverse=True)
+            counts = np.bincount(inverse, weights=bucket_counts[bucket_mask])
+            return AmountSketch(dict(zip(indexes.tolist(), counts.astype(int).tolist()))).quantiles(QUANTILES)
+
+        exact, exact_ms = timed(lambda: np.quantile(amounts[mask], QUANTILES, method="linear"), repeat)
+        estimates, sketch_ms = timed(merged, repeat)
+        for q, exact_value, estimate in zip(QUANTILES, exact, estimates):
+            error = relative_error(estimate, exact_value)
+            worst = max(worst, error)
+            print(f"{label:<26}{q:>9}{exact_value:>10.2f}{estimate:>10.2f}{error:>7.2%}{exact_ms:>10.1f}{sketch_ms:>10.1f}")
+    return worst
+
+
+def run_database(database_url: str, repeat: int) -> float:
+    """
+    Compares the stored sketches with percentile_cont; returns the worst relative error.
+    """
+    engine = create_engine(database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("--database-url must point at PostgreSQL (percentile_cont)")
+
+    with engine.connect() as conn:
+        first = conn.execute(text("SELECT min(month) FROM expense_amount_buckets")).scalar()
+        if first is None:
+            raise SystemExit("No sketches stored: fill the database or run scripts.rebuild_rollups first")
+        categories = conn.execute(text("SELECT DISTINCT category_id FROM expense_amount_buckets")).scalars().all()
+        print(f"{'range':<26}{'quantile':>9}{'exact':>10}{'sketch':>10}{'error':>8}{'exact ms':>10}{'sketch ms':>10}")
+
+        worst = 0.0
+        ranges = [
+            ("all", None, None, None),
+            ("one category", None, None, categories[:1]),
+            ("first 12 months", first, add_months(first, 11), None),
+        ]
+        for label, start, end_month, category_ids in ranges:
+            conditions, params = ["TRUE"], {"quantiles": list(QUANTILES)}
+            if start:
+                conditions.append("expense_date >= :start AND expense_date < :end")
+                params.update(start=start, end=next_month(end_month))
+            if category_ids:
+                conditions.append("coalesce(category_id, 0) = ANY(:categories)")
+                params["categories"] = list(category_ids)
+            exact_sql = text(
+                "SELECT percentile_cont(CAST(:quantiles AS float8[])) WITHIN GROUP (ORDER BY amount)"
+                f" FROM expenses WHERE {' AND '.join(conditions)}"
+            )
+
+            def merged():
+                rows = conn.execute(sketch_query("total", start, end_month, category_ids))
+                return merge_rows(rows, has_key=False)[None].quantiles(QUANTILES)
+
+            exact, exact_ms = timed(lambda: conn.execute(exact_sql, params).scalar(), repeat)
+            estimates, sketch_ms = timed(merged, repeat)
+            for q, exact_value, estimate in zip(QUANTILES, exact, estimates):
+                error = relative_error(estimate, float(exact_value))
+                worst = max(worst, error)
+                print(f"{label:<26}{q:>9}{exact_value:>10.2f}{estimate:>10.2f}{error:>7.2%}{exact_ms:>10.1f}{sketch_ms:>10.1f}")
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000], help="Dataset sizes (default: 1000000)")
+    parser.add_argument("--database-url", help="Compare the sketches stored in this PostgreSQL database")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query, median reported (default: 5)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument("--max-error", type=float, default=RELATIVE_ACCURACY,
+                        help=f"Fail above this relative error (default: {RELATIVE_ACCURACY})")
+    args = parser.parse_args()
+
+    if args.database_url:
+        worst = run_database(args.database_url, args.repeat)
+    else:
+        worst = max(run_synthetic(rows, args.repeat, args.seed) for rows in args.rows)
+
+    if worst > args.max_error:
+        print(f"❌ Worst relative error {worst:.2%} > {args.max_error:.2%}")
+        sys.exit(1)
+    print(f"✅ Worst relative error {worst:.2%} (target {RELATIVE_ACCURACY:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,47 @@
-import random
-from datetime import date, timedelta
+"""
+Generates random expenses for development and load testing.
+
+Rows are generated with NumPy in fixed-size chunks spread over worker
+processes. Each chunk draws from its own child of a SeedSequence, so the
+data only depends on --seed and --chunk-size, never on --workers.
+
+    python -m scripts.generate_expenses --rows 10000000 --workers 8
+    python -m scripts.generate_expenses --rows 1000000 --output expenses.parquet
+
+Without --output, chunks are loaded with COPY (PostgreSQL) or multi-row
+INSERTs by the workers, and rollups are rebuilt once at the end. With
+--output, a CSV or Parquet file with the bulk upload columns is written
+instead (identical bytes for the same seed).
+"""
+import argparse
+import csv
+import os
+from datetime import date
 from decimal import Decimal
+from multiprocessing import Pool
 
-from app.database.connection import SessionLocal
-from app.database.models import Expense, Category  # Make sure you have a Category model
+import numpy as np
+
+from app.database.connection import SessionLocal, engine
+from app.database.models import Category
+from app.services.expense_ingest import EXPENSE_COLUMNS, write_rows
+from app.services.rollups import rebuild_rollups
 
 # =========================
 # GENERAL CONFIGURATION
 # =========================
 
-NUM_EXPENSES = 200  # Number of expenses to generate
+NUM_EXPENSES = 200  # Default number of expenses to generate
 
 START_DATE = date(2025, 11, 1)
 END_DATE = date(2026, 3, 31)
 
+# Rows generated (and written) per task
+CHUNK_SIZE = 100_000
+
+# Rows per INSERT / COPY statement when loading the database
+LOAD_BATCH_SIZE = 10_000
+
 # Exact categories
 CATEGORIES = {
     1: "Food",
@@ -51,90 +79,135 @@ DESCRIPTIONS = {
 # HELPER FUNCTIONS
 # =========================
 
-def random_date(start: date, end: date) -> date:
+def generate_chunk(task: tuple) -> dict:
     """
-    Returns a random date between start and end dates.
+    Generates one chunk of random expenses with vectorized NumPy draws.
 
     Args:
-        start (date): Start date
-        end (date): End date
+        task (tuple): (seed sequence, row count, start date, end date, category ids).
 
     Returns:
-        date: Random date within the given range
+        dict: Column arrays: "amount_cents" (int64), "description" (object),
+        "expense_date" (datetime64[D]) and "category_id" (int32).
     """
-    delta = (end - start).days
-    return start + timedelta(days=random.randint(0, delta))
+    seed, size, start, end, category_ids = task
+    rng = np.random.default_rng(seed)
 
+    category_ids = np.asarray(category_ids, dtype=np.int32)
+    picks = rng.integers(0, len(category_ids), size)
 
-def random_amount(category_id: int) -> Decimal:
-    """
-    Returns a random amount in USD for a given category.
+    # Amount range per drawn category, uniform within it
+    lows = np.array([AMOUNT_RANGES_USD[c][0] for c in category_ids], dtype=np.float64)[picks]
+    highs = np.array([AMOUNT_RANGES_USD[c][1] for c in category_ids], dtype=np.float64)[picks]
+    amount_cents = np.rint((lows + rng.random(size) * (highs - lows)) * 100).astype(np.int64)
 
-    Args:
-        category_id (int): Category ID
+    # Descriptions of all categories in one flat table, indexed by offset + choice
+    counts = np.array([len(DESCRIPTIONS[c]) for c in category_ids])
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    table = np.array([text for c in category_ids for text in DESCRIPTIONS[c]], dtype=object)
+    choices = (rng.random(size) * counts[picks]).astype(np.int64)
 
-    Returns:
-        Decimal: Random expense amount
+    days = rng.integers(0, (end - start).days + 1, size)
+
+    return {
+        "amount_cents": amount_cents,
+        "description": table[offsets[picks] + choices],
+        "expense_date": np.datetime64(start, "D") + days,
+        "category_id": category_ids[picks],
+    }
+
+
+def chunk_rows(chunk: dict) -> list[tuple]:
+    """
+    Converts a generated chunk to (amount, description, expense_date, category_id) tuples.
     """
-    low, high = AMOUNT_RANGES_USD[category_id]
-    return Decimal(round(random.uniform(low, high), 2))  # Round to 2 decimals
+    return list(zip(
+        (Decimal(int(cents)).scaleb(-2) for cents in chunk["amount_cents"]),
+        chunk["description"],
+        chunk["expense_date"].astype(object),
+        chunk["category_id"].tolist(),
+    ))
 
 
-def random_description(category_id: int) -> str:
+def _init_worker():
     """
-    Returns a coherent description for a given category.
+    Drops database connections inherited from the parent process.
+    """
+    engine.dispose(close=False)
 
-    Args:
-        category_id (int): Category ID
+
+def load_chunk(task: tuple) -> int:
+    """
+    Generates a chunk and writes it to the database in its own transaction.
 
     Returns:
-        str: Random description
+        int: Number of rows written.
+    """
+    rows = chunk_rows(generate_chunk(task))
+    db = SessionLocal()
+    try:
+        for offset in range(0, len(rows), LOAD_BATCH_SIZE):
+            write_rows(db, rows[offset:offset + LOAD_BATCH_SIZE])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return len(rows)
+
+
+def plan_chunks(args) -> list[tuple]:
+    """
+    Splits the requested rows into generation tasks, one seed per chunk.
     """
-    return random.choice(DESCRIPTIONS[category_id])
+    sizes = [min(args.chunk_size, args.rows - offset) for offset in range(0, args.rows, args.chunk_size)]
+    seeds = np.random.SeedSequence(args.seed).spawn(len(sizes))
+    return [
+        (seed, size, args.start_date, args.end_date, args.categories)
+        for seed, size in zip(seeds, sizes)
+    ]
 
 # =========================
 # MAIN SCRIPT
 # =========================
 
-def create_categories(db):
+def create_categories(db, category_ids: list[int]):
     """
     Creates categories in the database if they do not already exist.
 
     Args:
         db (Session): Database session
+        category_ids (list[int]): Categories to create.
     """
-    for cat_id, name in CATEGORIES.items():
+    for cat_id in category_ids:
         # Avoid duplicates
         if not db.query(Category).filter_by(id=cat_id).first():
-            db.add(Category(id=cat_id, name=name))
+            db.add(Category(id=cat_id, name=CATEGORIES[cat_id]))
     db.commit()
     print("✅ Categories created successfully")
 
 
-def generate_expenses():
+def generate_to_database(args, tasks: list[tuple]):
     """
-    Generates random expenses and inserts them into the database.
+    Loads the generated expenses into the database, then rebuilds the rollups.
     """
     db = SessionLocal()
 
     try:
-        create_categories(db)
-
-        expenses = []
+        create_categories(db, args.categories)
 
-        for _ in range(NUM_EXPENSES):
-            category_id = random.choice(list(CATEGORIES.keys()))
-            expense = Expense(
-                amount=random_amount(category_id),
-                description=random_description(category_id),
-                expense_date=random_date(START_DATE, END_DATE),
-                category_id=category_id
-            )
-            expenses.append(expense)
+        written = 0
+        with Pool(args.workers, initializer=_init_worker) as pool:
+            for rows in pool.imap_unordered(load_chunk, tasks):
+                written += rows
+                print(f"   {written:,} / {args.rows:,} expenses", end="\r", flush=True)
+        print()
 
-        db.bulk_save_objects(expenses)
+        # Chunks skip per-batch rollup maintenance; one rebuild is much cheaper
+        rebuild_rollups(db)
         db.commit()
-        print(f"✅ {NUM_EXPENSES} expenses generated successfully")
+        print(f"✅ {written:,} expenses generated successfully")
 
     except Exception as e:
         db.rollback()
@@ -144,5 +217,108 @@ def generate_expenses():
         db.close()
 
 
+def write_csv(path: str, chunks):
+    """
+    Writes generated chunks to a CSV file with a header line.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as output:
+        writer = csv.writer(output)
+        writer.writerow(EXPENSE_COLUMNS)
+        for chunk in chunks:
+            writer.writerows(chunk_rows(chunk))
+
+
+def write_parquet(path: str, chunks):
+    """
+    Writes generated chunks to a Parquet file, one row group per chunk.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("amount", pa.decimal128(10, 2)),
+        ("description", pa.string()),
+        ("expense_date", pa.date32()),
+        ("category_id", pa.int32()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            amounts = [Decimal(int(cents)).scaleb(-2) for cents in chunk["amount_cents"]]
+            writer.write_table(pa.Table.from_arrays([
+                pa.array(amounts, type=schema.field("amount").type),
+                pa.array(chunk["description"], type=pa.string()),
+                pa.array(chunk["expense_date"], type=pa.date32()),
+                pa.array(chunk["category_id"], type=pa.int32()),
+            ], schema=schema))
+
+
+def generate_to_file(args, tasks: list[tuple]):
+    """
+    Writes the generated expenses to a CSV or Parquet file, in chunk order.
+    """
+    writer = write_parquet if args.output.endswith(".parquet") else write_csv
+
+    try:
+        with Pool(args.workers) as pool:
+            writer(args.output, pool.imap(generate_chunk, tasks))
+        print(f"✅ {args.rows:,} expenses written to {args.output}")
+
+    except ImportError:
+        print("❌ Parquet output requires the 'pyarrow' package")
+
+    except Exception as e:
+        print("❌ Error generating expenses:", e)
+
+
+def parse_args(argv=None):
+    """
+    Parses and validates the command line options.
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=NUM_EXPENSES,
+                        help=f"Number of expenses to generate (default: {NUM_EXPENSES})")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=START_DATE,
+                        help=f"First expense date (default: {START_DATE})")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=END_DATE,
+                        help=f"Last expense date (default: {END_DATE})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--categories", default=",".join(map(str, CATEGORIES)),
+                        help="Comma-separated category ids to draw from (default: all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Rows per generated chunk (default: {CHUNK_SIZE})")
+    parser.add_argument("--output", help="Write a .csv or .parquet file instead of loading the database")
+    args = parser.parse_args(argv)
+
+    try:
+        args.categories = [int(value) for value in args.categories.split(",") if value.strip()]
+    except ValueError:
+        parser.error("--categories must be comma-separated integers")
+    unknown = sorted(set(args.categories) - set(CATEGORIES))
+    if unknown or not args.categories:
+        parser.error(f"--categories must be taken from {sorted(CATEGORIES)} (unknown: {unknown})")
+    if args.rows < 1 or args.chunk_size < 1 or args.workers < 1:
+        parser.error("--rows, --chunk-size and --workers must be positive")
+    if args.end_date < args.start_date:
+        parser.error("--end-date must not be before --start-date")
+    if args.output and not args.output.endswith((".csv", ".parquet")):
+        parser.error("--output must end in .csv or .parquet")
+    return args
+
+
+def main(argv=None):
+    """
+    Generates random expenses into the database or a file.
+    """
+    args = parse_args(argv)
+    tasks = plan_chunks(args)
+
+    if args.output:
+        generate_to_file(args, tasks)
+    else:
+        generate_to_database(args, tasks)
+
+
 if __name__ == "__main__":
-    generate_expenses()
+    main()
@@ -0,0 +1,22 @@
+from app.database.connection import engine
+from app.database.models import Base
+
+
+def main():
+    """
+    Creates the database tables that do not exist yet.
+
+    Run it once before starting the API (and after adding models): the
+    application no longer issues DDL at import time, so worker startup
+    does not wait on the database.
+    """
+    try:
+        Base.metadata.create_all(bind=engine)
+        print(f"✅ Tables ready ({', '.join(sorted(Base.metadata.tables))})")
+
+    except Exception as e:
+        print("❌ Error creating tables:", e)
+
+
+if __name__ == "__main__":
+    main()
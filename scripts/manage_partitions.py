@@ -0,0 +1,91 @@
+"""
+Manages the monthly partitions of the expenses table (PostgreSQL only).
+
+    python -m scripts.manage_partitions convert            # partition an existing table
+    python -m scripts.manage_partitions ensure --months-ahead 3
+    python -m scripts.manage_partitions list
+    python -m scripts.manage_partitions archive 2023-01    # detach into the archive schema
+    python -m scripts.manage_partitions drop 2023-01       # detach and drop
+"""
+import argparse
+from datetime import datetime
+
+from app.config import settings
+from app.database.connection import SessionLocal
+from app.services import partitions
+
+
+def parse_month(value: str):
+    """
+    Parses a YYYY-MM month argument into the first day of that month.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a month as YYYY-MM, got {value!r}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (
+        ("convert", "Rebuild the expenses table as a partitioned table (copies every row)"),
+        ("ensure", "Create the current and upcoming monthly partitions"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--months-ahead", type=int, default=settings.partition_months_ahead,
+                             help=f"Future months to partition (default: {settings.partition_months_ahead})")
+
+    commands.add_parser("list", help="List the attached partitions")
+
+    for name, help_text in (
+        ("archive", f"Detach a month and move it to the {partitions.ARCHIVE_SCHEMA} schema"),
+        ("drop", "Detach a month and drop it"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("month", type=parse_month, help="Month to remove (YYYY-MM)")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Runs one partition maintenance command in a single transaction.
+    """
+    args = parse_args(argv)
+    db = SessionLocal()
+
+    try:
+        if args.command == "convert":
+            created = partitions.convert_to_partitioned(db, args.months_ahead)
+            db.commit()
+            print(f"✅ Expenses partitioned by month ({created} monthly partitions)")
+
+        elif args.command == "ensure":
+            if not partitions.is_partitioned(db):
+                raise ValueError("The expenses table is not partitioned (run convert first)")
+            created = partitions.ensure_partitions(db, args.months_ahead)
+            db.commit()
+            print(f"✅ Partitions ready ({', '.join(created) or 'none created'})")
+
+        elif args.command == "list":
+            for partition in partitions.list_partitions(db):
+                print(f"{partition['name']:<24} ~{partition['estimated_rows']:>10} rows  {partition['bounds']}")
+
+        else:
+            removed = partitions.detach_month(db, args.month, drop=args.command == "drop")
+            db.commit()
+            action = "Dropped" if args.command == "drop" else "Archived"
+            print(f"✅ {action} {args.month:%Y-%m} ({removed})")
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error running {args.command}:", e)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
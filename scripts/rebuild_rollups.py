@@ -0,0 +1,28 @@
+from app.database.connection import SessionLocal
+from app.services.rollups import rebuild_rollups
+
+
+def main():
+    """
+    Rebuilds the (month, category) expense rollups and amount sketches from the expenses table.
+
+    Run it once on an existing database and whenever expenses were written
+    outside the API (e.g. manual SQL), so reports match the raw data again.
+    """
+    db = SessionLocal()
+
+    try:
+        rows = rebuild_rollups(db)
+        db.commit()
+        print(f"✅ Rollups rebuilt ({rows} month/category rows)")
+
+    except Exception as e:
+        db.rollback()
+        print("❌ Error rebuilding rollups:", e)
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Routing of aggregations between the monthly rollups and the expenses table, on SQLite.
+"""
+import asyncio
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database.models import Base, Category, Expense, ExpenseRollup
+from app.services.aggregation import Grouping, aggregate, covers_whole_months
+
+# Rollup total deliberately different from the expenses, to tell the sources apart
+ROLLUP_TOTAL = Decimal("999.00")
+EXPENSES_TOTAL = Decimal("30.00")
+
+
+@pytest.mark.parametrize("start_date, end_date, expected", [
+    (None, None, True),
+    (date(2024, 1, 1), date(2024, 1, 31), True),
+    (date(2024, 2, 1), date(2024, 2, 29), True),
+    (date(2024, 1, 2), None, False),
+    (None, date(2024, 2, 28), False),
+    (None, date.max, True),
+    (date.min, date(9999, 12, 30), False),
+])
+def test_covers_whole_months(start_date, end_date, expected):
+    assert covers_whole_months(start_date, end_date) is expected
+
+
+def monthly_total(tmp_path, start_date, end_date) -> Decimal:
+    """
+    Aggregates the monthly total of a seeded SQLite database over a range.
+    """
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'aggregation.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(Category), [{"id": 1, "name": "Food", "essential": True}])
+            # Core inserts bypass the rollup hooks, so both sources stay as seeded
+            await conn.execute(insert(Expense), [
+                {"amount": Decimal("10.00"), "expense_date": date(2024, 1, 5), "category_id": 1},
+                {"amount": Decimal("20.00"), "expense_date": date(2024, 1, 20), "category_id": 1},
+            ])
+            await conn.execute(insert(ExpenseRollup), [{
+                "month": date(2024, 1, 1), "category_id": 1, "total": ROLLUP_TOTAL,
+                "count": 2, "min_amount": Decimal("10.00"), "max_amount": Decimal("20.00"),
+            }])
+
+        try:
+            async with async_sessionmaker(engine)() as db:
+                rows = await aggregate(db, "month", None, start_date, end_date)
+        finally:
+            await engine.dispose()
+        return sum((Decimal(str(row.total)) for row in rows), Decimal(0))
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    (None, None),
+    (date(2024, 1, 1), date(2024, 1, 31)),
+    (date(2024, 1, 1), date.max),
+])
+def test_whole_months_read_rollups(tmp_path, start_date, end_date):
+    assert monthly_total(tmp_path, start_date, end_date) == ROLLUP_TOTAL
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    (date(2024, 1, 2), None),
+    (date(2024, 1, 1), date(2024, 1, 30)),
+    (date.min, date(2024, 1, 25)),
+])
+def test_partial_months_read_expenses(tmp_path, start_date, end_date):
+    assert monthly_total(tmp_path, start_date, end_date) == EXPENSES_TOTAL
@@ -0,0 +1,108 @@
+"""
+Accuracy and merge behaviour of the amount sketches behind /reports/distribution
+(see benchmarks/distribution.py for the comparison against PostgreSQL).
+"""
+import numpy as np
+import pytest
+
+from app.services.distributions import (
+    RELATIVE_ACCURACY,
+    ZERO_BUCKET,
+    AmountSketch,
+    bucket_index,
+    bucket_upper_bound
+)
+
+QUANTILES = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def amounts(size: int, seed: int = 7) -> np.ndarray:
+    """
+    Seeded log-normal amounts rounded to cents, like real expenses.
+    """
+    rng = np.random.default_rng(seed)
+    return np.round(rng.lognormal(mean=3.5, sigma=1.2, size=size), 2) + 0.01
+
+
+def sketch_of(values) -> AmountSketch:
+    sketch = AmountSketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def exact_quantiles(values, qs: list[float]) -> list[float]:
+    """
+    Exact percentile_cont values (linear interpolation between closest ranks).
+    """
+    return [float(value) for value in np.quantile(values, qs, method="linear")]
+
+
+def test_quantiles_within_relative_accuracy():
+    values = amounts(20_000)
+    estimates = sketch_of(values).quantiles(QUANTILES)
+
+    for estimate, exact in zip(estimates, exact_quantiles(values, QUANTILES)):
+        assert estimate == pytest.approx(exact, rel=RELATIVE_ACCURACY)
+
+
+def test_merge_equals_sketch_of_union():
+    first, second = amounts(5_000, seed=1), amounts(3_000, seed=2)
+
+    merged = sketch_of(first)
+    merged.merge(sketch_of(second))
+    union = sketch_of(np.concatenate([first, second]))
+
+    assert merged.counts == union.counts
+    assert merged.quantiles(QUANTILES) == union.quantiles(QUANTILES)
+    for estimate, exact in zip(merged.quantiles(QUANTILES), exact_quantiles(np.concatenate([first, second]), QUANTILES)):
+        assert estimate == pytest.approx(exact, rel=RELATIVE_ACCURACY)
+
+
+def test_empty_sketch():
+    sketch = AmountSketch()
+
+    assert sketch.count == 0
+    assert sketch.quantiles([0.5, 0.9]) == [None, None]
+    assert sketch.histogram(10) == []
+
+
+def test_single_value():
+    sketch = sketch_of([42.5])
+
+    for estimate in sketch.quantiles(QUANTILES):
+        assert estimate == pytest.approx(42.5, rel=RELATIVE_ACCURACY)
+
+
+def test_zero_amounts():
+    values = [0, 0, 0, 10, 20]
+    sketch = sketch_of(values)
+
+    assert bucket_index(0) == ZERO_BUCKET
+    assert sketch.counts[ZERO_BUCKET] == 3
+    assert sketch.quantiles([0.0, 0.5]) == [0.0, 0.0]
+    assert sketch.quantiles([1.0])[0] == pytest.approx(20, rel=RELATIVE_ACCURACY)
+    assert sketch.histogram(5)[0] == (0.0, 0.0, 3)
+
+
+def test_histogram_with_more_bins_than_buckets():
+    sketch = sketch_of([10.0, 10.0, 10.01])
+    span = max(sketch.counts) - min(sketch.counts) + 1
+
+    histogram = sketch.histogram(span + 50)
+
+    assert len(histogram) == span
+    assert sum(count for _, _, count in histogram) == 3
+    for lower, upper, _ in histogram:
+        assert lower < upper
+    assert histogram[0][0] < 10.0 <= histogram[0][1]
+    assert histogram[-1][1] == bucket_upper_bound(max(sketch.counts))
+
+
+def test_histogram_counts_are_exact():
+    values = amounts(2_000, seed=3)
+    histogram = sketch_of(values).histogram(20)
+
+    assert len(histogram) <= 20
+    for lower, upper, count in histogram:
+        assert count == np.count_nonzero((values > lower) & (values <= upper))